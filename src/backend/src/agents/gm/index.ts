@@ -381,13 +381,11 @@ export class GMAgent {
       if (this.worldPackLoader) {
         try {
           const pack = await this.worldPackLoader.load(this.gameState.world_pack_id);
-          const constantEntries = pack.entries
-            ? Object.values(pack.entries).filter((e: any) => e.is_constant)
-            : [];
+          const constantEntries = this.worldPackLoader.getConstantEntries(pack);
 
           if (constantEntries.length > 0) {
             parts.push(`\n[World Background]`);
-            constantEntries.forEach((e: any) => {
+            constantEntries.forEach((e) => {
               const content = getLocalizedString(e.content, lang);
               if (content) parts.push(content);
             });
@@ -1,7 +1,7 @@
 import { generateObject } from 'ai';
 import type { LanguageModel } from 'ai';
 import { z } from 'zod';
-import type { NPCData } from '../../schemas';
+import type { NPCData, NPCSoul } from '../../schemas';
 import type { LanceDBService } from '../../lib/lance';
 
 const NPCResponseSchema = z.object({
@@ -20,6 +20,14 @@ const NPCResponseSchema = z.object({
   new_memory: z.string().optional().describe('Important event worth remembering, if any'),
 });
 
+/**
+ * Persona prompt sections keyed by soul object, then language.
+ *
+ * Souls come straight from the loaded world pack and never change, so the
+ * section is built once per NPC and language and reused every turn.
+ */
+const personaCache = new WeakMap<NPCSoul, Partial<Record<'cn' | 'en', string>>>();
+
 interface AgentResponse {
   content: string;
   success: boolean;
@@ -317,50 +325,70 @@ export class NPCAgent {
     return keywords;
   }
 
-  private buildSystemPrompt(
-    npc: NPCData,
-    _playerInput: string,
-    _context: Record<string, unknown>,
-    lang: 'cn' | 'en',
-    narrativeStyle: 'brief' | 'detailed',
-    roleplayDirection?: string,
-    gmInstruction?: string,
-    relevantMemories?: string[] // Retrieved memories from vector search
-  ): string {
-    const soul = npc.soul;
-    const body = npc.body;
-
-    const lines: string[] = [];
-
-    // Core Instruction (English for Logic)
-    lines.push(`You are ${soul.name}. Roleplay this character in first person.`);
-    lines.push(`Target Output Language: ${lang === 'cn' ? 'Chinese (Simplified)' : 'English'}`);
+  /**
+   * Static persona part of the system prompt (identity, background, personality,
+   * speech style, example dialogue), cached per soul and language.
+   */
+  private getPersonaSection(soul: NPCSoul, lang: 'cn' | 'en'): string {
+    let byLang = personaCache.get(soul);
+    const cached = byLang?.[lang];
+    if (cached !== undefined) {
+      return cached;
+    }
 
-    lines.push('');
-    lines.push('## Character Background');
+    const name = soul.name;
     // Use localized description if available, fall back to what's present
     const desc = soul.description[lang] || soul.description.en || soul.description.cn;
-    lines.push(desc);
-
-    lines.push('');
-    lines.push(`## Personality: ${soul.personality.join(', ')}`);
-
-    lines.push('');
-    lines.push('## Speech Style');
     const speechStyle = soul.speech_style
       ? soul.speech_style[lang] || soul.speech_style.en || soul.speech_style.cn
       : '';
+
+    const lines: string[] = [
+      // Core Instruction (English for Logic)
+      `You are ${name}. Roleplay this character in first person.`,
+      `Target Output Language: ${lang === 'cn' ? 'Chinese (Simplified)' : 'English'}`,
+      '',
+      '## Character Background',
+      desc,
+      '',
+      `## Personality: ${soul.personality.join(', ')}`,
+      '',
+      '## Speech Style',
+    ];
     if (speechStyle) lines.push(speechStyle);
 
     lines.push('');
     if (soul.example_dialogue && soul.example_dialogue.length > 0) {
       lines.push('## Example Dialogue');
-      for (const example of soul.example_dialogue) {
-        lines.push(`Player: ${example.user}`);
-        lines.push(`${soul.name}: ${example.char}`);
+      for (const { user, char } of soul.example_dialogue) {
+        lines.push(`Player: ${user}`, `${name}: ${char}`);
       }
     }
 
+    const section = lines.join('\n');
+    if (!byLang) {
+      byLang = {};
+      personaCache.set(soul, byLang);
+    }
+    byLang[lang] = section;
+    return section;
+  }
+
+  private buildSystemPrompt(
+    npc: NPCData,
+    _playerInput: string,
+    _context: Record<string, unknown>,
+    lang: 'cn' | 'en',
+    narrativeStyle: 'brief' | 'detailed',
+    roleplayDirection?: string,
+    gmInstruction?: string,
+    relevantMemories?: string[] // Retrieved memories from vector search
+  ): string {
+    const soul = npc.soul;
+    const body = npc.body;
+
+    const lines: string[] = [this.getPersonaSection(soul, lang)];
+
     lines.push('');
     lines.push('## Current State');
     if (body.tags && body.tags.length > 0) {
@@ -55,21 +55,8 @@ gameRouter.post('/game/new', zValidator('json', NewGameRequestSchema), async (c)
       );
     }
 
-    let startingLocationId: string | null = null;
-    let startingLocation = null;
-
-    for (const [locId, loc] of Object.entries(worldPack.locations)) {
-      if (loc.tags?.includes('starting_area')) {
-        startingLocationId = locId;
-        startingLocation = loc;
-        break;
-      }
-    }
-
-    if (!startingLocationId && Object.keys(worldPack.locations).length > 0) {
-      startingLocationId = Object.keys(worldPack.locations)[0] || null;
-      startingLocation = startingLocationId ? worldPack.locations[startingLocationId] : null;
-    }
+    const startingLocationId = ctx.worldPackLoader.getStartingLocationId(worldPack) ?? null;
+    const startingLocation = startingLocationId ? worldPack.locations[startingLocationId] : null;
 
     if (!startingLocation) {
       return c.json({ error: 'World pack has no locations defined' }, 400);
@@ -96,8 +83,9 @@ gameRouter.post('/game/new', zValidator('json', NewGameRequestSchema), async (c)
     let playerCharacter: PlayerCharacter;
 
     if (request.preset_character_id) {
-      const preset = worldPack.preset_characters?.find(
-        (p: any) => p.id === request.preset_character_id
+      const preset = ctx.worldPackLoader.getPresetCharacter(
+        worldPack,
+        request.preset_character_id
       );
       if (!preset) {
         const availableIds = worldPack.preset_characters?.map((p: any) => p.id) || [];
@@ -9,6 +9,8 @@ sqlite.pragma('journal_mode = WAL');
 sqlite.pragma('synchronous = NORMAL');
 sqlite.pragma('cache_size = -64000');
 sqlite.pragma('temp_store = MEMORY');
+sqlite.pragma('busy_timeout = 5000');
+sqlite.pragma('foreign_keys = ON');
 
 export const db: BetterSQLite3Database<typeof schema> = drizzle(sqlite, { schema });
 
@@ -34,6 +34,13 @@ const INSTRUCTIONS = {
 
 type InstructionType = keyof typeof INSTRUCTIONS;
 
+/**
+ * ONNX weight variants published for the model
+ */
+const EMBEDDING_DTYPES = ['fp32', 'fp16', 'q8'] as const;
+
+type EmbeddingDtype = (typeof EMBEDDING_DTYPES)[number];
+
 /**
  * Progress callback for model download
  * @param progress - Download progress information
@@ -70,6 +77,7 @@ export class QwenEmbedding {
   private static instance: QwenEmbedding | null = null;
   private pipeline: FeatureExtractionPipeline | null = null;
   private initPromise: Promise<void> | null = null;
+  private dtype: EmbeddingDtype | null = null;
 
   /**
    * Model identifier on HuggingFace
@@ -135,6 +143,24 @@ export class QwenEmbedding {
     return 'cpu';
   }
 
+  /**
+   * Model weight precision.
+   * Set via EMBEDDING_DTYPE env var: "fp32", "fp16", "q8"
+   * (default: fp16 on CUDA, fp32 on CPU)
+   *
+   * "q8" loads the int8-quantized ONNX weights: a much smaller file and faster
+   * CPU inference, at a small cost in embedding quality. Vectors from
+   * different dtypes should not be mixed; see getModelId().
+   */
+  private static getPreferredDtype(device: 'cuda' | 'cpu'): EmbeddingDtype {
+    const envDtype = process.env.EMBEDDING_DTYPE?.toLowerCase();
+    if (envDtype && (EMBEDDING_DTYPES as readonly string[]).includes(envDtype)) {
+      return envDtype as EmbeddingDtype;
+    }
+    // fp16 for GPU (faster), fp32 for CPU (more compatible)
+    return device === 'cuda' ? 'fp16' : 'fp32';
+  }
+
   /**
    * Initialize the embedding pipeline
    * Downloads model on first run (~240MB)
@@ -147,8 +173,10 @@ export class QwenEmbedding {
     }
 
     const preferredDevice = QwenEmbedding.getPreferredDevice();
+    const dtype = QwenEmbedding.getPreferredDtype(preferredDevice);
     console.log(`[QwenEmbedding] Loading model: ${QwenEmbedding.MODEL_NAME}...`);
-    console.log(`[QwenEmbedding] Device: ${preferredDevice}`);
+    console.log(`[QwenEmbedding] Device: ${preferredDevice}, dtype: ${dtype}`);
+    this.dtype = dtype;
 
     if (preferredDevice === 'cuda') {
       console.log('[QwenEmbedding] Note: GPU mode requires CUDA 12.x + cuDNN installed');
@@ -169,14 +197,26 @@ export class QwenEmbedding {
     // Create pipeline with specified device
     this.pipeline = await pipeline('feature-extraction', QwenEmbedding.MODEL_NAME, {
       device: preferredDevice,
-      // fp16 for GPU (faster), fp32 for CPU (more compatible)
-      dtype: preferredDevice === 'cuda' ? 'fp16' : 'fp32',
+      dtype,
       progress_callback: progressCallback,
     });
 
     console.log(`[QwenEmbedding] Model loaded successfully (${preferredDevice})`);
   }
 
+  /**
+   * Identifier of the loaded model and weight precision
+   *
+   * Vectors are only comparable when produced under the same identifier, so
+   * stored indexes record it and are rebuilt when it changes.
+   */
+  public getModelId(): string {
+    if (!this.dtype) {
+      throw new Error('QwenEmbedding not initialized. Call getInstance() first.');
+    }
+    return `${QwenEmbedding.MODEL_NAME}:${this.dtype}`;
+  }
+
   /**
    * Generate embedding for a single text
    *
@@ -288,14 +328,15 @@ export class QwenEmbedding {
     });
 
     // Extract embeddings
-    // Output shape: [batch_size, 1024]
+    // Output shape: [batch_size, 1024]; copy each row straight out of the tensor
+    // buffer (subarray is a view) instead of boxing the whole batch first
     const embeddings: number[][] = [];
-    const data = Array.from(output.data as Float32Array);
+    const data = output.data as Float32Array;
 
     for (let i = 0; i < texts.length; i++) {
       const start = i * QwenEmbedding.EMBEDDING_DIM;
       const end = start + QwenEmbedding.EMBEDDING_DIM;
-      embeddings.push(data.slice(start, end));
+      embeddings.push(Array.from(data.subarray(start, end)));
     }
 
     return embeddings;
@@ -310,6 +351,7 @@ export class QwenEmbedding {
   public static async cleanup(): Promise<void> {
     if (QwenEmbedding.instance) {
       QwenEmbedding.instance.pipeline = null;
+      QwenEmbedding.instance.dtype = null;
       QwenEmbedding.instance.initPromise = null;
       QwenEmbedding.instance = null;
     }
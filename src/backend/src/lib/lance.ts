@@ -10,7 +10,7 @@ interface VectorRecord {
   [key: string]: unknown; // Index signature for LanceDB compatibility
 }
 
-interface SearchResult {
+export interface SearchResult {
   id: string;
   text: string;
   distance: number;
@@ -32,6 +32,11 @@ export class LanceDBService {
 
   private static readonly DB_PATH = '../../data/lancedb';
 
+  /**
+   * Default number of documents embedded and written per chunk in addDocuments.
+   */
+  private static readonly ADD_BATCH_SIZE = 128;
+
   private constructor() {}
 
   public static async getInstance(): Promise<LanceDBService> {
@@ -61,6 +66,16 @@ export class LanceDBService {
     console.log('[LanceDB] Service initialized');
   }
 
+  /**
+   * Identifier of the embedding model and precision behind stored vectors.
+   */
+  public getEmbeddingModelId(): string {
+    if (!this.embedder) {
+      throw new Error('Embedder not initialized');
+    }
+    return this.embedder.getModelId();
+  }
+
   public async getOrCreateTable(tableName: string): Promise<Table> {
     if (!this.connection) {
       throw new Error('LanceDB not initialized');
@@ -95,11 +110,18 @@ export class LanceDBService {
     return null;
   }
 
+  /**
+   * Embed and store documents, creating the table on first write.
+   *
+   * Documents are processed in chunks of `batchSize`, so only one chunk of
+   * vectors is held in memory at a time and each write stays a bounded size.
+   */
   public async addDocuments(
     tableName: string,
     documents: string[],
     ids: string[],
-    metadatas?: Record<string, string | number | boolean>[]
+    metadatas?: Record<string, string | number | boolean>[],
+    batchSize: number = LanceDBService.ADD_BATCH_SIZE
   ): Promise<void> {
     if (!this.connection) {
       throw new Error('LanceDB not initialized');
@@ -121,25 +143,32 @@ export class LanceDBService {
       throw new Error('metadatas array must match documents length');
     }
 
-    const embeddings = await this.embedder.embedBatch(documents, 'document');
-
-    const records: VectorRecord[] = documents.map((text, i) => ({
-      id: ids[i]!,
-      text,
-      vector: embeddings[i]!,
-      metadata: metadatas?.[i],
-    }));
+    if (!Number.isInteger(batchSize) || batchSize < 1) {
+      throw new Error('batchSize must be a positive integer');
+    }
 
     // Check if table exists
-    const tableNames = await this.connection.tableNames();
-
-    if (tableNames.includes(tableName)) {
-      // Table exists, add records
-      const table = await this.connection.openTable(tableName);
-      await table.add(records);
-    } else {
-      // Table doesn't exist, create with initial data
-      await this.connection.createTable({ name: tableName, data: records });
+    let table = await this.getTableIfExists(tableName);
+
+    for (let start = 0; start < documents.length; start += batchSize) {
+      const end = Math.min(start + batchSize, documents.length);
+      const chunk = documents.slice(start, end);
+      const embeddings = await this.embedder.embedBatch(chunk, 'document');
+
+      const records: VectorRecord[] = chunk.map((text, i) => ({
+        id: ids[start + i]!,
+        text,
+        vector: embeddings[i]!,
+        metadata: metadatas?.[start + i],
+      }));
+
+      if (table) {
+        // Table exists, add records
+        await table.add(records);
+      } else {
+        // Table doesn't exist, create with the first chunk
+        table = await this.connection.createTable({ name: tableName, data: records });
+      }
     }
   }
 
@@ -162,6 +191,49 @@ export class LanceDBService {
 
     const queryVector = await this.embedder.embed(queryText, 'query');
 
+    return this.searchByVector(table, queryVector, limit, filter);
+  }
+
+  /**
+   * Search several queries against the same table and filter. The query
+   * embeddings are computed in one batch and the table is opened once.
+   *
+   * @returns One result list per query text, in input order
+   */
+  public async searchBatch(
+    tableName: string,
+    queryTexts: string[],
+    limit: number = 10,
+    filter?: string
+  ): Promise<SearchResult[][]> {
+    if (!this.embedder) {
+      throw new Error('Embedder not initialized');
+    }
+
+    if (queryTexts.length === 0) {
+      return [];
+    }
+
+    const table = await this.getTableIfExists(tableName);
+
+    if (!table) {
+      // Table doesn't exist, return empty results
+      return queryTexts.map(() => []);
+    }
+
+    const queryVectors = await this.embedder.embedBatch(queryTexts, 'query');
+
+    return Promise.all(
+      queryVectors.map((queryVector) => this.searchByVector(table, queryVector, limit, filter))
+    );
+  }
+
+  private async searchByVector(
+    table: Table,
+    queryVector: number[],
+    limit: number,
+    filter?: string
+  ): Promise<SearchResult[]> {
     let query = table.search(queryVector).limit(limit);
 
     if (filter) {
@@ -1,5 +1,24 @@
 import type { Outcome, DiceResult } from '../schemas';
 
+const OUTCOME_TEXTS: Record<'cn' | 'en', Record<Outcome, string>> = {
+  cn: { critical: '大成功', success: '成功', partial: '部分成功', failure: '失败' },
+  en: {
+    critical: 'Critical Success',
+    success: 'Success',
+    partial: 'Partial Success',
+    failure: 'Failure',
+  },
+};
+
+const MODIFIER_TEXTS: Record<'cn' | 'en', { bonus: string; penalty: string }> = {
+  cn: { bonus: '优势骰', penalty: '劣势骰' },
+  en: { bonus: 'Advantage', penalty: 'Disadvantage' },
+};
+
+function rollDie(): number {
+  return Math.floor(Math.random() * 6) + 1;
+}
+
 export class DicePool {
   constructor(
     public modifier: number = 0,
@@ -9,11 +28,30 @@ export class DicePool {
 
   roll(): DiceResult {
     const netBonus = this.bonusDice - this.penaltyDice;
+
+    // Plain 2d6 is the common case: both dice are kept, no sort needed
+    if (netBonus === 0) {
+      const first = rollDie();
+      const second = rollDie();
+      const total = first + second + this.modifier;
+
+      return {
+        all_rolls: [first, second],
+        kept_rolls: first >= second ? [first, second] : [second, first],
+        dropped_rolls: [],
+        modifier: this.modifier,
+        total,
+        outcome: DicePool.determineOutcome(total),
+        is_bonus: false,
+        is_penalty: false,
+      };
+    }
+
     const diceCount = 2 + Math.abs(netBonus);
 
     const allRolls: number[] = [];
     for (let i = 0; i < diceCount; i++) {
-      allRolls.push(Math.floor(Math.random() * 6) + 1);
+      allRolls.push(rollDie());
     }
 
     const sortedRolls = [...allRolls].sort((a, b) => b - a);
@@ -81,18 +119,6 @@ export function toDisplay(
   outcome: string;
   modifierText: string | null;
 } {
-  const outcomeTexts: Record<Outcome, { cn: string; en: string }> = {
-    critical: { cn: '大成功', en: 'Critical Success' },
-    success: { cn: '成功', en: 'Success' },
-    partial: { cn: '部分成功', en: 'Partial Success' },
-    failure: { cn: '失败', en: 'Failure' },
-  };
-
-  const modifierTexts = {
-    bonus: { cn: '优势骰', en: 'Advantage' },
-    penalty: { cn: '劣势骰', en: 'Disadvantage' },
-  };
-
   const parts: string[] = [];
 
   if (result.all_rolls.length > 2) {
@@ -112,13 +138,13 @@ export function toDisplay(
   parts.push(`= ${result.total}`);
   const rollDetail = parts.join(' ');
 
-  const outcomeText = outcomeTexts[result.outcome][lang];
+  const outcomeText = OUTCOME_TEXTS[lang][result.outcome];
 
   let modifierText: string | null = null;
   if (result.is_bonus) {
-    modifierText = modifierTexts.bonus[lang];
+    modifierText = MODIFIER_TEXTS[lang].bonus;
   } else if (result.is_penalty) {
-    modifierText = modifierTexts.penalty[lang];
+    modifierText = MODIFIER_TEXTS[lang].penalty;
   }
 
   return {
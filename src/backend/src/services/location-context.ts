@@ -9,6 +9,7 @@
 
 import { WorldPackLoader } from './world';
 import { getLocalizedString } from '../schemas';
+import type { LocationData, WorldPack } from '../schemas';
 
 export interface HierarchicalContext {
   region: {
@@ -30,11 +31,61 @@ export interface HierarchicalContext {
   atmosphere_guidance: string;
 }
 
+/**
+ * Built contexts per pack, keyed by language, location and the hidden items
+ * already revealed there. Packs are immutable once loaded, so an entry only
+ * goes stale when the player discovers something at that location, which
+ * produces a different key.
+ */
+const contextCache = new WeakMap<WorldPack, Map<string, HierarchicalContext>>();
+
+/**
+ * The localized, discovery-independent part of a location's context.
+ */
+interface LocationView {
+  region: HierarchicalContext['region'];
+  name: string;
+  description: string;
+  atmosphere: string;
+  visible_items: string[];
+  atmosphere_guidance: string;
+  basic_lore: string[];
+}
+
+/**
+ * Localized location views per pack, keyed by language and location. Shared by
+ * every discovery state of the same location.
+ */
+const viewCache = new WeakMap<WorldPack, Map<string, LocationView>>();
+
+/**
+ * Copy a cached context down to its arrays, so callers can never mutate the
+ * cache or the pack data the arrays come from.
+ */
+function copyContext(context: HierarchicalContext): HierarchicalContext {
+  return {
+    region: {
+      ...context.region,
+      atmosphere_keywords: [...context.region.atmosphere_keywords],
+    },
+    location: {
+      ...context.location,
+      visible_items: [...context.location.visible_items],
+      hidden_items_revealed: [...context.location.hidden_items_revealed],
+      hidden_items_remaining: [...context.location.hidden_items_remaining],
+    },
+    basic_lore: [...context.basic_lore],
+    atmosphere_guidance: context.atmosphere_guidance,
+  };
+}
+
 export class LocationContextService {
   constructor(private worldPackLoader: WorldPackLoader) {}
 
   /**
    * Build complete hierarchical context for a location.
+   *
+   * Results are memoized per discovery state; each call gets its own copy.
    */
   public async getContextForLocation(
     worldPackId: string,
@@ -50,6 +101,73 @@ export class LocationContextService {
       return this.emptyContext();
     }
 
+    // Determine hidden items state
+    const hiddenItems = location.hidden_items || [];
+    const discovered = new Set(discoveredItems);
+    const hiddenItemsRevealed: string[] = [];
+    const hiddenItemsRemaining: string[] = [];
+    for (const item of hiddenItems) {
+      if (discovered.has(item)) {
+        hiddenItemsRevealed.push(item);
+      } else {
+        hiddenItemsRemaining.push(item);
+      }
+    }
+
+    let packCache = contextCache.get(pack);
+    if (!packCache) {
+      packCache = new Map();
+      contextCache.set(pack, packCache);
+    }
+    const cacheKey = [lang, locationId, ...hiddenItemsRevealed].join('\u0000');
+    const cached = packCache.get(cacheKey);
+    if (cached) {
+      return copyContext(cached);
+    }
+
+    const view = this.getLocationView(pack, location, lang);
+
+    // Build location context
+    const locationContext = {
+      id: location.id,
+      name: view.name,
+      description: view.description,
+      atmosphere: view.atmosphere,
+      visible_items: view.visible_items,
+      hidden_items_revealed: hiddenItemsRevealed,
+      hidden_items_remaining: hiddenItemsRemaining,
+    };
+
+    const context: HierarchicalContext = {
+      region: view.region,
+      location: locationContext,
+      basic_lore: view.basic_lore,
+      atmosphere_guidance: view.atmosphere_guidance,
+    };
+    packCache.set(cacheKey, context);
+
+    return copyContext(context);
+  }
+
+  /**
+   * Resolve and localize the static parts of a location once per language.
+   */
+  private getLocationView(
+    pack: WorldPack,
+    location: LocationData,
+    lang: 'cn' | 'en'
+  ): LocationView {
+    let packViews = viewCache.get(pack);
+    if (!packViews) {
+      packViews = new Map();
+      viewCache.set(pack, packViews);
+    }
+    const viewKey = `${lang}\u0000${location.id}`;
+    const cached = packViews.get(viewKey);
+    if (cached) {
+      return cached;
+    }
+
     // Get region
     let region = location.region_id ? pack.regions[location.region_id] : undefined;
     if (!region && pack.regions) {
@@ -57,8 +175,7 @@ export class LocationContextService {
       region = pack.regions['_global'];
     }
 
-    // Build region context
-    const regionContext = {
+    const regionContext: HierarchicalContext['region'] = {
       id: region ? region.id : '_global',
       name: region
         ? getLocalizedString(region.name, lang)
@@ -69,47 +186,22 @@ export class LocationContextService {
         region && region.narrative_tone ? getLocalizedString(region.narrative_tone, lang) : '',
       atmosphere_keywords: region ? region.atmosphere_keywords : [],
     };
+    const atmosphere = location.atmosphere ? getLocalizedString(location.atmosphere, lang) : '';
 
-    // Determine hidden items state
-    const hiddenItems = location.hidden_items || [];
-    const hiddenItemsRevealed = hiddenItems.filter((item) => discoveredItems.includes(item));
-    const hiddenItemsRemaining = hiddenItems.filter((item) => !discoveredItems.includes(item));
-
-    // Build location context
-    const locationContext = {
-      id: location.id,
+    const view: LocationView = {
+      region: regionContext,
       name: getLocalizedString(location.name, lang),
       description: getLocalizedString(location.description, lang),
-      atmosphere: location.atmosphere ? getLocalizedString(location.atmosphere, lang) : '',
+      atmosphere,
       visible_items: location.visible_items || location.items || [],
-      hidden_items_revealed: hiddenItemsRevealed,
-      hidden_items_remaining: hiddenItemsRemaining,
+      atmosphere_guidance: this.buildAtmosphereGuidance(regionContext, atmosphere, lang),
+      basic_lore: this.worldPackLoader
+        .getScopedLore(pack, location.id, region?.id, 'basic')
+        .map((entry) => getLocalizedString(entry.content, lang)),
     };
+    packViews.set(viewKey, view);
 
-    // Get basic lore
-    // Manual iteration is required as getLoreForLocation is not available on WorldPack type
-    const basicLoreEntries: string[] = [];
-    if (pack.entries) {
-      for (const entry of Object.values(pack.entries)) {
-        if (entry.visibility !== 'basic') continue;
-
-        const isApplicableLoc = entry.applicable_locations?.includes(locationId);
-        const isApplicableRegion = region && entry.applicable_regions?.includes(region.id);
-
-        if (isApplicableLoc || isApplicableRegion) {
-          basicLoreEntries.push(getLocalizedString(entry.content, lang));
-        }
-      }
-    }
-
-    const atmosphereGuidance = this.buildAtmosphereGuidance(regionContext, locationContext, lang);
-
-    return {
-      region: regionContext,
-      location: locationContext,
-      basic_lore: basicLoreEntries,
-      atmosphere_guidance: atmosphereGuidance,
-    };
+    return view;
   }
 
   private emptyContext(): HierarchicalContext {
@@ -136,7 +228,7 @@ export class LocationContextService {
 
   private buildAtmosphereGuidance(
     regionContext: HierarchicalContext['region'],
-    locationContext: HierarchicalContext['location'],
+    atmosphere: string,
     lang: 'cn' | 'en'
   ): string {
     const parts: string[] = [];
@@ -145,8 +237,8 @@ export class LocationContextService {
       parts.push(regionContext.narrative_tone);
     }
 
-    if (locationContext.atmosphere) {
-      parts.push(locationContext.atmosphere);
+    if (atmosphere) {
+      parts.push(atmosphere);
     }
 
     if (regionContext.atmosphere_keywords && regionContext.atmosphere_keywords.length > 0) {
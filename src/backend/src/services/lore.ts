@@ -1,4 +1,5 @@
 import { LanceDBService } from '../lib/lance';
+import type { SearchResult } from '../lib/lance';
 import { WorldPackLoader } from './world';
 import type { LoreEntry, WorldPack } from '../schemas';
 
@@ -6,6 +7,179 @@ const KEYWORD_MATCH_WEIGHT = 2.0;
 const KEYWORD_SECONDARY_WEIGHT = 1.0;
 const VECTOR_MATCH_WEIGHT = 0.8;
 const DUAL_MATCH_BOOST = 1.5;
+/** Constant entries always rank at least this high */
+const CONSTANT_SCORE_FLOOR = 2.0;
+const MAX_LORE_RESULTS = 5;
+
+const STOP_WORDS = new Set([
+  '的',
+  '了',
+  '是',
+  '在',
+  '我',
+  '你',
+  '他',
+  '她',
+  '它',
+  '有',
+  '没有',
+  '什么',
+  '怎么',
+  '如何',
+  '这',
+  '那',
+  '就',
+  '也',
+  '都',
+  '很',
+  '非常',
+  'a',
+  'an',
+  'the',
+  'is',
+  'are',
+  'was',
+  'were',
+  'be',
+  'been',
+  'being',
+  'have',
+  'has',
+  'had',
+  'do',
+  'does',
+  'did',
+  'will',
+  'would',
+  'should',
+]);
+
+const SEGMENTER = new Intl.Segmenter(['zh-CN', 'en'], {
+  granularity: 'word',
+});
+
+const PUNCTUATION_PATTERN = /[，。！？：；''()（）[\]【】""]/g;
+
+const CJK_PATTERN = /[\u4e00-\u9fff]/;
+
+/** User-facing search messages by language */
+const LORE_MESSAGES = {
+  cn: {
+    noQuery: '未提供查询内容。',
+    noResults: (query: string) => `没有找到与'${query}'相关的背景信息。`,
+    header: (query: string) => `与'${query}'相关的背景信息：\n`,
+    error: (message: string) => `检索背景信息时出错: ${message}`,
+  },
+  en: {
+    noQuery: 'No query provided.',
+    noResults: (query: string) => `No background information found related to '${query}'.`,
+    header: (query: string) => `Background information related to '${query}':\n`,
+    error: (message: string) => `Error retrieving lore: ${message}`,
+  },
+} as const;
+
+const SEARCH_TERMS_CACHE_SIZE = 1024;
+
+/**
+ * Extracted search terms by raw query, in least-recently-used order. Agents
+ * often repeat the same lore query within a turn, so segmentation is skipped
+ * on a hit. Cached arrays are shared; do not mutate them.
+ */
+const searchTermsCache = new Map<string, string[]>();
+
+const VECTOR_SEARCH_LIMIT = 10;
+const VECTOR_LANG_FILTERS: Record<'cn' | 'en', string> = {
+  cn: 'lang = "cn"',
+  en: 'lang = "en"',
+};
+/** How long vector queries wait for others sharing their table and filter */
+const VECTOR_BATCH_WINDOW_MS = 5;
+
+const SEARCH_CACHE_SIZE = 256;
+const SEARCH_CACHE_TTL_MS = 60_000;
+
+interface CachedSearch {
+  /** Pack the result was computed against; a reloaded pack invalidates it */
+  worldPack: WorldPack;
+  result: string;
+  expiresAt: number;
+}
+
+interface LoreSearchResult {
+  entries: LoreEntry[];
+  /** False when the vector leg failed or the pack's index was still being built */
+  complete: boolean;
+}
+
+interface PendingVectorSearch {
+  query: string;
+  resolve: (results: SearchResult[]) => void;
+  reject: (error: unknown) => void;
+}
+
+interface VectorSearchBatch {
+  collectionName: string;
+  filter: string;
+  requests: PendingVectorSearch[];
+}
+
+export interface LoreCacheStats {
+  size: number;
+  maxSize: number;
+  hits: number;
+  misses: number;
+  hitRate: number;
+}
+
+/**
+ * Whether search may surface an entry at the given location and region.
+ */
+function isSearchable(entry: LoreEntry, currentLocation?: string, currentRegion?: string): boolean {
+  if (entry.visibility !== 'basic' && !entry.constant) {
+    return false;
+  }
+
+  if (
+    entry.applicable_locations &&
+    entry.applicable_locations.length > 0 &&
+    (!currentLocation || !entry.applicable_locations.includes(currentLocation))
+  ) {
+    return false;
+  }
+
+  if (
+    entry.applicable_regions &&
+    entry.applicable_regions.length > 0 &&
+    (!currentRegion || !entry.applicable_regions.includes(currentRegion))
+  ) {
+    return false;
+  }
+
+  return true;
+}
+
+/** Formatted lore blocks per entry and language */
+const formattedEntryCache = new WeakMap<LoreEntry, Partial<Record<'cn' | 'en', string>>>();
+
+/**
+ * Format one entry as it appears in search output, falling back to English
+ * content. Entries are immutable once loaded, so the block is built once.
+ */
+function formatEntry(entry: LoreEntry, lang: 'cn' | 'en'): string {
+  let formatted = formattedEntryCache.get(entry);
+  if (!formatted) {
+    formatted = {};
+    formattedEntryCache.set(entry, formatted);
+  }
+
+  let block = formatted[lang];
+  if (block === undefined) {
+    const content = entry.content[lang] || entry.content.en || '';
+    block = entry.key && entry.key.length > 0 ? `[${entry.key.join(' / ')}]\n${content}` : content;
+    formatted[lang] = block;
+  }
+  return block;
+}
 
 interface EntryScore {
   entry: LoreEntry;
@@ -14,7 +188,50 @@ interface EntryScore {
   vectorMatch: boolean;
 }
 
+/**
+ * Rank by score, then constant entries first, then by `order`.
+ */
+function compareEntryScores(a: EntryScore, b: EntryScore): number {
+  if (a.score !== b.score) {
+    return b.score - a.score;
+  }
+  if (a.entry.constant !== b.entry.constant) {
+    return a.entry.constant ? -1 : 1;
+  }
+  return a.entry.order - b.entry.order;
+}
+
+/**
+ * The `limit` best items by `compare`, equivalent to a stable sort followed by
+ * a slice but without sorting the whole candidate list.
+ */
+function selectTop<T>(items: Iterable<T>, limit: number, compare: (a: T, b: T) => number): T[] {
+  const top: T[] = [];
+  for (const item of items) {
+    if (top.length === limit && compare(item, top[limit - 1]!) >= 0) {
+      continue;
+    }
+
+    let i = top.length;
+    while (i > 0 && compare(item, top[i - 1]!) < 0) {
+      i--;
+    }
+    top.splice(i, 0, item);
+    if (top.length > limit) {
+      top.pop();
+    }
+  }
+  return top;
+}
+
 export class LoreService {
+  /** Formatted search results in least-recently-used order */
+  private searchCache = new Map<string, CachedSearch>();
+  private cacheHits = 0;
+  private cacheMisses = 0;
+  /** Vector queries waiting to be flushed, by collection and filter */
+  private pendingVectorSearches = new Map<string, VectorSearchBatch>();
+
   constructor(
     private worldPackLoader: WorldPackLoader,
     private vectorStore?: LanceDBService
@@ -38,13 +255,23 @@ export class LoreService {
     } = params;
 
     if (!query) {
-      return lang === 'cn' ? '未提供查询内容。' : 'No query provided.';
+      return LORE_MESSAGES[lang].noQuery;
     }
 
     try {
       const worldPack = await this.worldPackLoader.load(worldPackId);
 
-      const loreEntries = await this.searchLore(
+      // The context only feeds formatting and is currently unused, so it is not
+      // part of the key
+      const cacheKey = [worldPackId, lang, currentLocation ?? '', currentRegion ?? '', query].join(
+        '\u0000'
+      );
+      const cached = this.getCachedSearch(cacheKey, worldPack);
+      if (cached !== undefined) {
+        return cached;
+      }
+
+      const { entries, complete } = await this.searchLore(
         worldPack,
         query,
         context,
@@ -53,11 +280,59 @@ export class LoreService {
         currentRegion
       );
 
-      return this.formatLore(loreEntries, query, context, lang);
+      const result = this.formatLore(entries, query, context, lang);
+      // A keyword-only fallback would otherwise stand in for the full result
+      if (complete) {
+        this.setCachedSearch(cacheKey, worldPack, result);
+      }
+
+      return result;
     } catch (error) {
       const message = error instanceof Error ? error.message : String(error);
-      return lang === 'cn' ? `检索背景信息时出错: ${message}` : `Error retrieving lore: ${message}`;
+      return LORE_MESSAGES[lang].error(message);
+    }
+  }
+
+  getCacheStats(): LoreCacheStats {
+    const lookups = this.cacheHits + this.cacheMisses;
+    return {
+      size: this.searchCache.size,
+      maxSize: SEARCH_CACHE_SIZE,
+      hits: this.cacheHits,
+      misses: this.cacheMisses,
+      hitRate: lookups > 0 ? this.cacheHits / lookups : 0,
+    };
+  }
+
+  private getCachedSearch(key: string, worldPack: WorldPack): string | undefined {
+    const cached = this.searchCache.get(key);
+    if (!cached || cached.worldPack !== worldPack || cached.expiresAt <= Date.now()) {
+      if (cached) {
+        this.searchCache.delete(key);
+      }
+      this.cacheMisses++;
+      return undefined;
+    }
+
+    // Re-insert to mark as most recently used
+    this.searchCache.delete(key);
+    this.searchCache.set(key, cached);
+    this.cacheHits++;
+    return cached.result;
+  }
+
+  private setCachedSearch(key: string, worldPack: WorldPack, result: string): void {
+    if (this.searchCache.size >= SEARCH_CACHE_SIZE) {
+      const oldest = this.searchCache.keys().next().value;
+      if (oldest !== undefined) {
+        this.searchCache.delete(oldest);
+      }
     }
+    this.searchCache.set(key, {
+      worldPack,
+      result,
+      expiresAt: Date.now() + SEARCH_CACHE_TTL_MS,
+    });
   }
 
   private async searchLore(
@@ -67,30 +342,36 @@ export class LoreService {
     worldPackId: string,
     currentLocation?: string,
     currentRegion?: string
-  ): Promise<LoreEntry[]> {
-    const constantEntries = this.getConstantEntries(worldPack);
+  ): Promise<LoreSearchResult> {
+    const constantEntries = this.worldPackLoader.getConstantEntries(worldPack);
 
     if (!this.vectorStore) {
-      return this.keywordOnlySearch(
-        worldPack,
-        query,
-        constantEntries,
-        currentLocation,
-        currentRegion
-      );
+      return {
+        entries: this.keywordOnlySearch(
+          worldPack,
+          query,
+          constantEntries,
+          currentLocation,
+          currentRegion
+        ),
+        complete: true,
+      };
     }
 
-    const entryScores = new Map<string, EntryScore>();
+    // Ineligible entries are dropped before they are scored or boosted
+    const isEligible = (entry: LoreEntry) => isSearchable(entry, currentLocation, currentRegion);
+    const entryScores = new Map<number, EntryScore>();
 
     const searchTerms = this.extractSearchTerms(query);
-    const keywordMatchedUids = new Set<number>();
 
+    // During keyword collection the score map holds exactly the entries matched
+    // so far, so it doubles as the seen-set
     for (const term of searchTerms) {
-      const primaryMatches = this.searchEntriesByKeyword(worldPack, term, false);
-      for (const entry of primaryMatches) {
-        keywordMatchedUids.add(entry.uid);
-        if (!entryScores.has(String(entry.uid))) {
-          entryScores.set(String(entry.uid), {
+      const matches = this.worldPackLoader.findEntriesByKeywordTerm(worldPack, term);
+
+      for (const entry of matches.primary) {
+        if (!entryScores.has(entry.uid) && isEligible(entry)) {
+          entryScores.set(entry.uid, {
             entry,
             score: KEYWORD_MATCH_WEIGHT,
             keywordMatch: true,
@@ -99,14 +380,9 @@ export class LoreService {
         }
       }
 
-      const secondaryMatches = this.searchEntriesByKeyword(worldPack, term, true);
-      for (const entry of secondaryMatches) {
-        if (keywordMatchedUids.has(entry.uid)) {
-          continue;
-        }
-        keywordMatchedUids.add(entry.uid);
-        if (!entryScores.has(String(entry.uid))) {
-          entryScores.set(String(entry.uid), {
+      for (const entry of matches.secondary) {
+        if (!entryScores.has(entry.uid) && isEligible(entry)) {
+          entryScores.set(entry.uid, {
             entry,
             score: KEYWORD_SECONDARY_WEIGHT,
             keywordMatch: true,
@@ -116,15 +392,15 @@ export class LoreService {
       }
     }
 
+    let complete = !this.worldPackLoader.isIndexing(worldPackId);
     try {
       const searchLang = this.detectLanguage(query);
       const collectionName = `lore_entries_${worldPackId}`;
 
-      const results = await this.vectorStore.search(
+      const results = await this.queueVectorSearch(
         collectionName,
         query,
-        10,
-        `lang = "${searchLang}"`
+        VECTOR_LANG_FILTERS[searchLang]
       );
 
       for (const result of results) {
@@ -133,14 +409,14 @@ export class LoreService {
         const similarity = 1.0 - distance;
         const vectorScore = VECTOR_MATCH_WEIGHT * similarity;
 
-        const existingScore = entryScores.get(String(uid));
+        const existingScore = entryScores.get(uid);
         if (existingScore) {
           existingScore.score *= DUAL_MATCH_BOOST;
           existingScore.vectorMatch = true;
         } else {
-          const entry = this.getEntry(worldPack, uid);
-          if (entry) {
-            entryScores.set(String(uid), {
+          const entry = this.worldPackLoader.getEntry(worldPack, uid);
+          if (entry && isEligible(entry)) {
+            entryScores.set(uid, {
               entry,
               score: vectorScore,
               keywordMatch: false,
@@ -150,66 +426,89 @@ export class LoreService {
         }
       }
     } catch (error) {
+      complete = false;
       console.error('[LoreService] Vector search failed:', error);
     }
 
+    // Raise matched constants to the floor too, so a weak match never ranks
+    // a constant below the unmatched ones
     for (const entry of constantEntries) {
-      if (!entryScores.has(String(entry.uid))) {
-        entryScores.set(String(entry.uid), {
+      if (!isEligible(entry)) {
+        continue;
+      }
+      const existingScore = entryScores.get(entry.uid);
+      if (existingScore) {
+        existingScore.score = Math.max(existingScore.score, CONSTANT_SCORE_FLOOR);
+      } else {
+        entryScores.set(entry.uid, {
           entry,
-          score: 2.0,
+          score: CONSTANT_SCORE_FLOOR,
           keywordMatch: false,
           vectorMatch: false,
         });
       }
     }
 
-    const filtered = this.filterByLocation(
-      Array.from(entryScores.values()),
-      currentLocation,
-      currentRegion
-    );
+    return {
+      entries: selectTop(entryScores.values(), MAX_LORE_RESULTS, compareEntryScores).map(
+        (item) => item.entry
+      ),
+      complete,
+    };
+  }
 
-    const sorted = filtered.sort((a, b) => {
-      if (a.score !== b.score) {
-        return b.score - a.score;
+  /**
+   * Queue a vector query to be sent together with others against the same
+   * collection and filter that arrive within the batch window.
+   */
+  private queueVectorSearch(
+    collectionName: string,
+    query: string,
+    filter: string
+  ): Promise<SearchResult[]> {
+    const batchKey = `${collectionName}\u0000${filter}`;
+
+    return new Promise((resolve, reject) => {
+      let batch = this.pendingVectorSearches.get(batchKey);
+      if (!batch) {
+        batch = { collectionName, filter, requests: [] };
+        this.pendingVectorSearches.set(batchKey, batch);
+        setTimeout(() => void this.flushVectorSearches(batchKey), VECTOR_BATCH_WINDOW_MS);
       }
-      return a.entry.order - b.entry.order;
+      batch.requests.push({ query, resolve, reject });
     });
-
-    return sorted.slice(0, 5).map((item) => item.entry);
   }
 
-  private filterByLocation(
-    entryScores: EntryScore[],
-    currentLocation?: string,
-    currentRegion?: string
-  ): EntryScore[] {
-    return entryScores.filter((item) => {
-      const { entry } = item;
+  private async flushVectorSearches(batchKey: string): Promise<void> {
+    const batch = this.pendingVectorSearches.get(batchKey);
+    this.pendingVectorSearches.delete(batchKey);
+    if (!batch || !this.vectorStore) {
+      return;
+    }
 
-      if (entry.visibility !== 'basic' && !entry.constant) {
-        return false;
-      }
+    const { collectionName, filter, requests } = batch;
 
-      if (
-        entry.applicable_locations &&
-        entry.applicable_locations.length > 0 &&
-        (!currentLocation || !entry.applicable_locations.includes(currentLocation))
-      ) {
-        return false;
+    try {
+      if (requests.length === 1) {
+        const request = requests[0]!;
+        request.resolve(
+          await this.vectorStore.search(collectionName, request.query, VECTOR_SEARCH_LIMIT, filter)
+        );
+        return;
       }
 
-      if (
-        entry.applicable_regions &&
-        entry.applicable_regions.length > 0 &&
-        (!currentRegion || !entry.applicable_regions.includes(currentRegion))
-      ) {
-        return false;
+      const results = await this.vectorStore.searchBatch(
+        collectionName,
+        requests.map((request) => request.query),
+        VECTOR_SEARCH_LIMIT,
+        filter
+      );
+      requests.forEach((request, i) => request.resolve(results[i] ?? []));
+    } catch (error) {
+      for (const request of requests) {
+        request.reject(error);
       }
-
-      return true;
-    });
+    }
   }
 
   private keywordOnlySearch(
@@ -220,103 +519,56 @@ export class LoreService {
     currentRegion?: string
   ): LoreEntry[] {
     const searchTerms = this.extractSearchTerms(query);
-    const matchedEntries: LoreEntry[] = [];
-
-    for (const term of searchTerms) {
-      const matches = this.searchEntriesByKeyword(worldPack, term, true);
-      matchedEntries.push(...matches);
-    }
 
-    const uniqueEntries = new Map<string, LoreEntry>();
-    for (const entry of [...constantEntries, ...matchedEntries]) {
-      uniqueEntries.set(String(entry.uid), entry);
+    // Nothing to match (e.g. a query of only stop words): just the constants
+    if (searchTerms.length === 0) {
+      return constantEntries
+        .filter((entry) => isSearchable(entry, currentLocation, currentRegion))
+        .sort((a, b) => a.order - b.order);
     }
 
-    const filtered = Array.from(uniqueEntries.values()).filter((entry) => {
-      if (entry.visibility !== 'basic' && !entry.constant) {
-        return false;
-      }
+    const matchedEntries: LoreEntry[] = [];
 
-      if (
-        entry.applicable_locations &&
-        entry.applicable_locations.length > 0 &&
-        (!currentLocation || !entry.applicable_locations.includes(currentLocation))
-      ) {
-        return false;
-      }
+    for (const term of searchTerms) {
+      const matches = this.worldPackLoader.findEntriesByKeywordTerm(worldPack, term);
+      matchedEntries.push(...matches.all);
+    }
 
-      if (
-        entry.applicable_regions &&
-        entry.applicable_regions.length > 0 &&
-        (!currentRegion || !entry.applicable_regions.includes(currentRegion))
-      ) {
-        return false;
+    const seenUids = new Set<number>();
+    const filtered: LoreEntry[] = [];
+    for (const list of [constantEntries, matchedEntries]) {
+      for (const entry of list) {
+        if (seenUids.has(entry.uid)) {
+          continue;
+        }
+        seenUids.add(entry.uid);
+        if (isSearchable(entry, currentLocation, currentRegion)) {
+          filtered.push(entry);
+        }
       }
-
-      return true;
-    });
+    }
 
     return filtered.sort((a, b) => a.order - b.order);
   }
 
   private extractSearchTerms(query: string): string[] {
-    const stopWords = new Set([
-      '的',
-      '了',
-      '是',
-      '在',
-      '我',
-      '你',
-      '他',
-      '她',
-      '它',
-      '有',
-      '没有',
-      '什么',
-      '怎么',
-      '如何',
-      '这',
-      '那',
-      '就',
-      '也',
-      '都',
-      '很',
-      '非常',
-      'a',
-      'an',
-      'the',
-      'is',
-      'are',
-      'was',
-      'were',
-      'be',
-      'been',
-      'being',
-      'have',
-      'has',
-      'had',
-      'do',
-      'does',
-      'did',
-      'will',
-      'would',
-      'should',
-    ]);
-
-    const segmenter = new Intl.Segmenter(['zh-CN', 'en'], {
-      granularity: 'word',
-    });
-    const segments = segmenter.segment(query);
+    const cached = searchTermsCache.get(query);
+    if (cached) {
+      // Re-insert to mark as most recently used
+      searchTermsCache.delete(query);
+      searchTermsCache.set(query, cached);
+      return cached;
+    }
 
     const terms: string[] = [];
     const seen = new Set<string>();
 
-    for (const { segment } of segments) {
-      const cleanWord = segment.trim().replace(/[，。！？：；''()（）[\]【】""]/g, '');
+    for (const { segment } of SEGMENTER.segment(query)) {
+      const cleanWord = segment.trim().replace(PUNCTUATION_PATTERN, '');
 
       if (
         cleanWord &&
-        !stopWords.has(cleanWord) &&
+        !STOP_WORDS.has(cleanWord) &&
         cleanWord.length > 1 &&
         cleanWord.trim().length > 0 &&
         !seen.has(cleanWord)
@@ -329,6 +581,14 @@ export class LoreService {
       }
     }
 
+    if (searchTermsCache.size >= SEARCH_TERMS_CACHE_SIZE) {
+      const oldest = searchTermsCache.keys().next().value;
+      if (oldest !== undefined) {
+        searchTermsCache.delete(oldest);
+      }
+    }
+    searchTermsCache.set(query, terms);
+
     return terms;
   }
 
@@ -339,71 +599,16 @@ export class LoreService {
     lang: 'cn' | 'en'
   ): string {
     if (entries.length === 0) {
-      return lang === 'cn'
-        ? `没有找到与'${query}'相关的背景信息。`
-        : `No background information found related to '${query}'.`;
+      return LORE_MESSAGES[lang].noResults(query);
     }
 
-    const formattedParts = entries.map((entry) => {
-      const content = entry.content[lang] || entry.content.en || '';
-
-      if (entry.key && entry.key.length > 0) {
-        const keyStr = entry.key.join(' / ');
-        return `[${keyStr}]\n${content}`;
-      }
-
-      return content;
-    });
-
-    const loreText = formattedParts.join('\n\n');
-
-    const header =
-      lang === 'cn'
-        ? `与'${query}'相关的背景信息：\n`
-        : `Background information related to '${query}':\n`;
-
-    return header + loreText;
-  }
-
-  private getConstantEntries(worldPack: WorldPack): LoreEntry[] {
-    return Object.values(worldPack.entries).filter((entry: any) => entry.constant);
-  }
-
-  private searchEntriesByKeyword(
-    worldPack: WorldPack,
-    keyword: string,
-    includeSecondary: boolean
-  ): LoreEntry[] {
-    return Object.values(worldPack.entries).filter((entry: any) => {
-      const primaryMatch = entry.key.some((k: any) =>
-        k.toLowerCase().includes(keyword.toLowerCase())
-      );
-
-      if (primaryMatch) {
-        return true;
-      }
-
-      if (includeSecondary && entry.secondary_keys) {
-        return entry.secondary_keys.some((k: any) =>
-          k.toLowerCase().includes(keyword.toLowerCase())
-        );
-      }
-
-      return false;
-    });
-  }
+    const loreText = entries.map((entry) => formatEntry(entry, lang)).join('\n\n');
 
-  private getEntry(worldPack: WorldPack, uid: number): LoreEntry | undefined {
-    return Object.values(worldPack.entries).find((entry: any) => entry.uid === uid);
+    return LORE_MESSAGES[lang].header(query) + loreText;
   }
 
   private detectLanguage(text: string): 'cn' | 'en' {
-    for (const char of text) {
-      if (char >= '\u4e00' && char <= '\u9fff') {
-        return 'cn';
-      }
-    }
-    return 'en';
+    return CJK_PATTERN.test(text) ? 'cn' : 'en';
   }
 }
 
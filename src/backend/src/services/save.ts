@@ -1,10 +1,35 @@
-import { eq, desc } from 'drizzle-orm';
+import { eq, desc, sql, count } from 'drizzle-orm';
 import { db, schema } from '../db';
 import type { GameState } from '../schemas';
 import { GameStateSchema } from '../schemas';
 
 const MAX_SAVE_SLOTS = 10;
 
+type SaveTransaction = Parameters<Parameters<typeof db.transaction>[0]>[0];
+
+/** Save slot columns other than the serialized game state */
+type SaveSlotColumns = Omit<typeof schema.saveSlots.$inferSelect, 'gameStateJson'>;
+
+/**
+ * Single-row save slot lookups, compiled once and reused.
+ */
+function prepareSaveSlotQueries() {
+  return {
+    byId: db
+      .select()
+      .from(schema.saveSlots)
+      .where(eq(schema.saveSlots.id, sql.placeholder('id')))
+      .limit(1)
+      .prepare(),
+    byName: db
+      .select()
+      .from(schema.saveSlots)
+      .where(eq(schema.saveSlots.slotName, sql.placeholder('slotName')))
+      .limit(1)
+      .prepare(),
+  };
+}
+
 export interface SaveSlotPreview {
   id: number;
   sessionId: string;
@@ -44,6 +69,7 @@ export interface LoadSaveResult {
 
 export class SaveService {
   private static instance: SaveService | null = null;
+  private queries: ReturnType<typeof prepareSaveSlotQueries> | null = null;
 
   private constructor() {}
 
@@ -54,15 +80,21 @@ export class SaveService {
     return SaveService.instance;
   }
 
-  private async ensureGameSessionExists(gameState: GameState): Promise<void> {
-    const existing = await db
-      .select()
-      .from(schema.gameSessions)
-      .where(eq(schema.gameSessions.sessionId, gameState.session_id))
-      .limit(1);
+  /**
+   * Prepared lazily so the statements are compiled against an initialized schema.
+   */
+  private getQueries(): ReturnType<typeof prepareSaveSlotQueries> {
+    if (!this.queries) {
+      this.queries = prepareSaveSlotQueries();
+    }
+    return this.queries;
+  }
 
-    if (existing.length === 0) {
-      await db.insert(schema.gameSessions).values({
+  private ensureGameSessionExists(tx: SaveTransaction, gameState: GameState): void {
+    const activeNpcIdsJson = JSON.stringify(gameState.active_npc_ids);
+
+    tx.insert(schema.gameSessions)
+      .values({
         sessionId: gameState.session_id,
         worldPackId: gameState.world_pack_id,
         playerName: gameState.player_name,
@@ -70,20 +102,19 @@ export class SaveService {
         currentLocation: gameState.current_location,
         currentPhase: gameState.current_phase,
         turnCount: gameState.turn_count,
-        activeNpcIdsJson: JSON.stringify(gameState.active_npc_ids),
-      });
-    } else {
-      await db
-        .update(schema.gameSessions)
-        .set({
+        activeNpcIdsJson,
+      })
+      .onConflictDoUpdate({
+        target: schema.gameSessions.sessionId,
+        set: {
           currentLocation: gameState.current_location,
           currentPhase: gameState.current_phase,
           turnCount: gameState.turn_count,
-          activeNpcIdsJson: JSON.stringify(gameState.active_npc_ids),
-          updatedAt: new Date(),
-        })
-        .where(eq(schema.gameSessions.sessionId, gameState.session_id));
-    }
+          activeNpcIdsJson,
+          updatedAt: sql`(strftime('%s', 'now'))`,
+        },
+      })
+      .run();
   }
 
   public async listSaves(): Promise<SaveSlotPreview[]> {
@@ -96,108 +127,108 @@ export class SaveService {
   }
 
   public async getSaveCount(): Promise<number> {
-    const result = await db.select().from(schema.saveSlots);
-    return result.length;
+    const [result] = await db.select({ value: count() }).from(schema.saveSlots);
+    return result?.value ?? 0;
   }
 
   public async findByName(slotName: string): Promise<SaveSlotPreview | null> {
-    const results = await db
-      .select()
-      .from(schema.saveSlots)
-      .where(eq(schema.saveSlots.slotName, slotName))
-      .limit(1);
+    const save = this.getQueries().byName.get({ slotName });
 
-    if (results.length === 0) {
-      return null;
-    }
-
-    return this.toPreview(results[0]!);
+    return save ? this.toPreview(save) : null;
   }
 
   public async findById(id: number): Promise<SaveSlotPreview | null> {
-    const results = await db
-      .select()
-      .from(schema.saveSlots)
-      .where(eq(schema.saveSlots.id, id))
-      .limit(1);
-
-    if (results.length === 0) {
-      return null;
-    }
+    const save = this.getQueries().byId.get({ id });
 
-    return this.toPreview(results[0]!);
+    return save ? this.toPreview(save) : null;
   }
 
   public async createSave(
     gameState: GameState,
     request: CreateSaveRequest
   ): Promise<CreateSaveResult> {
-    const count = await this.getSaveCount();
-    if (count >= MAX_SAVE_SLOTS && !request.overwrite) {
-      return {
-        success: false,
-        error: `Save limit reached (${MAX_SAVE_SLOTS}). Delete old saves or overwrite existing ones.`,
-      };
-    }
-
-    const existing = await this.findByName(request.slotName);
-    if (existing && !request.overwrite) {
-      return {
-        success: false,
-        exists: true,
-        existingId: existing.id,
-        error: `Save "${request.slotName}" already exists.`,
-      };
-    }
-
-    if (existing && request.overwrite) {
-      await this.deleteSave(existing.id);
-    }
+    const gameStateJson = JSON.stringify(gameState);
 
-    await this.ensureGameSessionExists(gameState);
+    // IMMEDIATE takes the write lock up front, so the limit and name checks
+    // cannot be invalidated by another writer before the insert lands
+    return db.transaction(
+      (tx): CreateSaveResult => {
+        const [total] = tx.select({ value: count() }).from(schema.saveSlots).all();
+        if ((total?.value ?? 0) >= MAX_SAVE_SLOTS && !request.overwrite) {
+          return {
+            success: false,
+            error: `Save limit reached (${MAX_SAVE_SLOTS}). Delete old saves or overwrite existing ones.`,
+          };
+        }
 
-    const gameStateJson = JSON.stringify(gameState);
+        const existing = tx
+          .select({ id: schema.saveSlots.id })
+          .from(schema.saveSlots)
+          .where(eq(schema.saveSlots.slotName, request.slotName))
+          .limit(1)
+          .get();
+        if (existing && !request.overwrite) {
+          return {
+            success: false,
+            exists: true,
+            existingId: existing.id,
+            error: `Save "${request.slotName}" already exists.`,
+          };
+        }
 
-    const result = await db
-      .insert(schema.saveSlots)
-      .values({
-        sessionId: gameState.session_id,
-        slotName: request.slotName,
-        gameStateJson: gameStateJson,
-        description: request.description || null,
-        isAutoSave: request.isAutoSave || false,
-      })
-      .returning();
+        if (existing && request.overwrite) {
+          tx.delete(schema.saveSlots).where(eq(schema.saveSlots.id, existing.id)).run();
+        }
 
-    if (result.length === 0) {
-      return {
-        success: false,
-        error: 'Failed to create save slot.',
-      };
-    }
+        this.ensureGameSessionExists(tx, gameState);
+
+        const save = tx
+          .insert(schema.saveSlots)
+          .values({
+            sessionId: gameState.session_id,
+            slotName: request.slotName,
+            gameStateJson: gameStateJson,
+            description: request.description || null,
+            isAutoSave: request.isAutoSave || false,
+          })
+          // The state blob was just serialized here; don't copy it back out
+          .returning({
+            id: schema.saveSlots.id,
+            sessionId: schema.saveSlots.sessionId,
+            slotName: schema.saveSlots.slotName,
+            description: schema.saveSlots.description,
+            isAutoSave: schema.saveSlots.isAutoSave,
+            createdAt: schema.saveSlots.createdAt,
+            updatedAt: schema.saveSlots.updatedAt,
+          })
+          .get();
+
+        if (!save) {
+          return {
+            success: false,
+            error: 'Failed to create save slot.',
+          };
+        }
 
-    return {
-      success: true,
-      save: this.toPreview(result[0]!),
-    };
+        return {
+          success: true,
+          save: this.toPreview(save, gameState),
+        };
+      },
+      { behavior: 'immediate' }
+    );
   }
 
   public async loadSave(id: number): Promise<LoadSaveResult> {
-    const results = await db
-      .select()
-      .from(schema.saveSlots)
-      .where(eq(schema.saveSlots.id, id))
-      .limit(1);
+    const save = this.getQueries().byId.get({ id });
 
-    if (results.length === 0) {
+    if (!save) {
       return {
         success: false,
         error: `Save slot with ID ${id} not found.`,
       };
     }
 
-    const save = results[0]!;
-
     try {
       const rawGameState = JSON.parse(save.gameStateJson);
       const gameState = GameStateSchema.parse(rawGameState);
@@ -216,12 +247,19 @@ export class SaveService {
   }
 
   public async deleteSave(id: number): Promise<boolean> {
-    const result = await db.delete(schema.saveSlots).where(eq(schema.saveSlots.id, id)).returning();
+    const result = await db.delete(schema.saveSlots).where(eq(schema.saveSlots.id, id));
 
-    return result.length > 0;
+    return result.changes > 0;
   }
 
-  private toPreview(save: typeof schema.saveSlots.$inferSelect): SaveSlotPreview {
+  /**
+   * Build a list preview for a slot. Pass `gameState` when it is already in
+   * memory (e.g. right after saving) to skip re-parsing the stored JSON.
+   */
+  private toPreview(
+    save: SaveSlotColumns & { gameStateJson?: string },
+    gameState?: GameState
+  ): SaveSlotPreview {
     let worldPackId = '';
     let currentLocation = '';
     let turnCount = 0;
@@ -230,15 +268,15 @@ export class SaveService {
     let lastMessage: string | null = null;
 
     try {
-      const gameState = JSON.parse(save.gameStateJson) as GameState;
-      worldPackId = gameState.world_pack_id;
-      currentLocation = gameState.current_location;
-      turnCount = gameState.turn_count;
-      playerName = gameState.player_name;
-      characterName = gameState.player?.name || '';
-
-      if (gameState.messages && gameState.messages.length > 0) {
-        const last = gameState.messages[gameState.messages.length - 1];
+      const state = gameState ?? (JSON.parse(save.gameStateJson ?? '') as GameState);
+      worldPackId = state.world_pack_id;
+      currentLocation = state.current_location;
+      turnCount = state.turn_count;
+      playerName = state.player_name;
+      characterName = state.player?.name || '';
+
+      if (state.messages && state.messages.length > 0) {
+        const last = state.messages[state.messages.length - 1];
         if (last) {
           lastMessage =
             last.content.length > 100 ? last.content.substring(0, 100) + '...' : last.content;
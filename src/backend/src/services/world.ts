@@ -2,12 +2,193 @@ import { promises as fs } from 'fs';
 import path from 'path';
 import crypto from 'crypto';
 import { WorldPackSchema } from '../schemas';
-import type { WorldPack, LoreEntry, NPCData, LocationData, RegionData } from '../schemas';
+import type {
+  WorldPack,
+  LoreEntry,
+  NPCData,
+  LocationData,
+  RegionData,
+  PresetCharacter,
+} from '../schemas';
 import type { LanceDBService } from '../lib/lance';
 
+/**
+ * Lookup structures derived from a validated world pack.
+ *
+ * Packs are read-only once loaded, so the index is built once on first use
+ * and reused for every query against the same pack object.
+ */
+interface WorldPackIndex {
+  /** Entries in pack declaration order */
+  entries: LoreEntry[];
+  /** Numeric uid -> entry */
+  entriesByUid: Map<number, LoreEntry>;
+  /** Lowercased primary keyword -> entries declaring it */
+  primaryKeywords: Map<string, LoreEntry[]>;
+  /** Lowercased secondary keyword -> entries declaring it */
+  secondaryKeywords: Map<string, LoreEntry[]>;
+  /** Constant entries in declaration order */
+  constantEntries: LoreEntry[];
+  /** Entries explicitly scoped to locations/regions, by visibility, in declaration order */
+  scopedBuckets: Map<string, ScopedBucket>;
+  /** Declaration position of each entry, used to restore declaration order */
+  positions: Map<LoreEntry, number>;
+  /** Preset character id -> preset */
+  presetsById: Map<string, PresetCharacter>;
+  /** First location tagged `starting_area`, else the first location declared */
+  startingLocationId: string | undefined;
+}
+
+/**
+ * Entries of one visibility level listed under every location and region they
+ * name, regardless of `constant` or how the other scope is set.
+ */
+interface ScopedBucket {
+  byLocation: Map<string, LoreEntry[]>;
+  byRegion: Map<string, LoreEntry[]>;
+}
+
+/**
+ * Entries matching a search term, in declaration order.
+ */
+export interface KeywordTermMatches {
+  /** Every matched entry */
+  all: LoreEntry[];
+  /** Entries with a primary keyword containing the term */
+  primary: LoreEntry[];
+  /** Entries matched only through a secondary keyword */
+  secondary: LoreEntry[];
+}
+
+function addToBucket<K, V>(buckets: Map<K, V[]>, key: K, value: V): void {
+  const bucket = buckets.get(key);
+  if (bucket) {
+    bucket.push(value);
+  } else {
+    buckets.set(key, [value]);
+  }
+}
+
+function buildWorldPackIndex(pack: WorldPack): WorldPackIndex {
+  const entries = Object.values(pack.entries);
+  const primaryKeywords = new Map<string, LoreEntry[]>();
+  const secondaryKeywords = new Map<string, LoreEntry[]>();
+  const constantEntries: LoreEntry[] = [];
+  const scopedBuckets = new Map<string, ScopedBucket>();
+  const positions = new Map<LoreEntry, number>();
+  const entriesByUid = new Map<number, LoreEntry>();
+
+  entries.forEach((entry, position) => {
+    positions.set(entry, position);
+    entriesByUid.set(entry.uid, entry);
+
+    for (const key of new Set((entry.key ?? []).map((k) => k.toLowerCase()))) {
+      addToBucket(primaryKeywords, key, entry);
+    }
+    for (const key of new Set((entry.secondary_keys ?? []).map((k) => k.toLowerCase()))) {
+      addToBucket(secondaryKeywords, key, entry);
+    }
+
+    const visibility = entry.visibility ?? 'basic';
+    const locations = entry.applicable_locations ?? [];
+    const regions = entry.applicable_regions ?? [];
+
+    let scoped = scopedBuckets.get(visibility);
+    if (!scoped) {
+      scoped = { byLocation: new Map(), byRegion: new Map() };
+      scopedBuckets.set(visibility, scoped);
+    }
+    for (const locationId of new Set(locations)) {
+      addToBucket(scoped.byLocation, locationId, entry);
+    }
+    for (const regionId of new Set(regions)) {
+      addToBucket(scoped.byRegion, regionId, entry);
+    }
+
+    if (entry.constant) {
+      constantEntries.push(entry);
+    }
+  });
+
+  let startingLocationId: string | undefined;
+  let firstLocationId: string | undefined;
+  for (const [locationId, location] of Object.entries(pack.locations ?? {})) {
+    if (firstLocationId === undefined) {
+      firstLocationId = locationId;
+    }
+    if (startingLocationId === undefined && location.tags?.includes('starting_area')) {
+      startingLocationId = locationId;
+    }
+  }
+
+  return {
+    entries,
+    entriesByUid,
+    primaryKeywords,
+    secondaryKeywords,
+    constantEntries,
+    scopedBuckets,
+    positions,
+    presetsById: new Map((pack.preset_characters ?? []).map((p) => [p.id, p])),
+    startingLocationId: startingLocationId ?? firstLocationId,
+  };
+}
+
+/**
+ * Union of two lists in declaration order, each already in declaration order.
+ */
+function unionByPosition(
+  first: LoreEntry[],
+  second: LoreEntry[],
+  positions: Map<LoreEntry, number>
+): LoreEntry[] {
+  const union: LoreEntry[] = [];
+  let i = 0;
+  let j = 0;
+  while (i < first.length && j < second.length) {
+    const a = positions.get(first[i]!)!;
+    const b = positions.get(second[j]!)!;
+    if (a === b) {
+      union.push(first[i++]!);
+      j++;
+    } else {
+      union.push(a < b ? first[i++]! : second[j++]!);
+    }
+  }
+  while (i < first.length) {
+    union.push(first[i++]!);
+  }
+  while (j < second.length) {
+    union.push(second[j++]!);
+  }
+  return union;
+}
+
+/**
+ * Add every entry with a keyword that contains the term.
+ */
+function collectContainingKeyword(
+  keywords: Map<string, LoreEntry[]>,
+  termLower: string,
+  matches: Set<LoreEntry>
+): void {
+  for (const [token, entries] of keywords) {
+    if (token.includes(termLower)) {
+      for (const entry of entries) {
+        matches.add(entry);
+      }
+    }
+  }
+}
+
 export class WorldPackLoader {
   private packsDir: string;
   private loadedPacks: Map<string, WorldPack> = new Map();
+  /** Loads in progress, so concurrent callers share one read and parse */
+  private pendingLoads: Map<string, Promise<WorldPack>> = new Map();
+  /** Vector indexing runs in progress, by pack id */
+  private pendingIndexing: Map<string, Promise<void>> = new Map();
+  private packIndexes: WeakMap<WorldPack, WorldPackIndex> = new WeakMap();
   private vectorStore?: LanceDBService;
 
   constructor(packsDir: string = './data/packs', vectorStore?: LanceDBService) {
@@ -23,10 +204,50 @@ export class WorldPackLoader {
   }
 
   async load(packId: string): Promise<WorldPack> {
-    if (this.loadedPacks.has(packId)) {
-      return this.loadedPacks.get(packId)!;
+    const loaded = this.loadedPacks.get(packId);
+    if (loaded) {
+      return loaded;
+    }
+
+    const existing = this.pendingLoads.get(packId);
+    if (existing) {
+      return existing;
+    }
+
+    // Only the load still registered as pending may publish its result or
+    // clear the slot; one invalidated mid-flight must not resurrect its pack
+    const pending: Promise<WorldPack> = this.loadFromDisk(packId)
+      .then((worldPack) => {
+        if (this.pendingLoads.get(packId) === pending) {
+          this.loadedPacks.set(packId, worldPack);
+        }
+        return worldPack;
+      })
+      .finally(() => {
+        if (this.pendingLoads.get(packId) === pending) {
+          this.pendingLoads.delete(packId);
+        }
+      });
+    this.pendingLoads.set(packId, pending);
+    return pending;
+  }
+
+  /**
+   * Forget a loaded pack (or every pack) so the next load re-reads it from
+   * disk. Indexes and caches keyed on the old pack object are dropped with it.
+   */
+  invalidate(packId?: string): void {
+    if (packId === undefined) {
+      this.loadedPacks.clear();
+      this.pendingLoads.clear();
+      return;
     }
 
+    this.loadedPacks.delete(packId);
+    this.pendingLoads.delete(packId);
+  }
+
+  private async loadFromDisk(packId: string): Promise<WorldPack> {
     const packPath = path.join(this.packsDir, `${packId}.json`);
 
     try {
@@ -36,13 +257,18 @@ export class WorldPackLoader {
       const worldPack = WorldPackSchema.parse(rawData);
       console.log(`[WorldPackLoader] Pack validated successfully`);
 
-      this.loadedPacks.set(packId, worldPack);
-
       // Fire-and-forget async indexing (non-blocking)
       if (this.vectorStore) {
-        this.indexLoreEntriesAsync(packId, worldPack).catch((error) => {
-          console.error(`[WorldPackLoader] Async indexing failed for ${packId}:`, error);
-        });
+        const indexing: Promise<void> = this.indexLoreEntriesAsync(packId, worldPack)
+          .catch((error) => {
+            console.error(`[WorldPackLoader] Async indexing failed for ${packId}:`, error);
+          })
+          .finally(() => {
+            if (this.pendingIndexing.get(packId) === indexing) {
+              this.pendingIndexing.delete(packId);
+            }
+          });
+        this.pendingIndexing.set(packId, indexing);
       }
 
       return worldPack;
@@ -55,6 +281,14 @@ export class WorldPackLoader {
     }
   }
 
+  /**
+   * Whether the pack's lore is still being written to the vector store, in
+   * which case vector search may miss entries.
+   */
+  isIndexing(packId: string): boolean {
+    return this.pendingIndexing.has(packId);
+  }
+
   async listAvailable(): Promise<string[]> {
     try {
       const entries = await fs.readdir(this.packsDir, { withFileTypes: true });
@@ -79,8 +313,24 @@ export class WorldPackLoader {
     }
   }
 
+  private getIndex(pack: WorldPack): WorldPackIndex {
+    let index = this.packIndexes.get(pack);
+    if (!index) {
+      index = buildWorldPackIndex(pack);
+      this.packIndexes.set(pack, index);
+    }
+    return index;
+  }
+
   getEntry(pack: WorldPack, uid: number): LoreEntry | undefined {
-    return pack.entries[uid.toString()];
+    return this.getIndex(pack).entriesByUid.get(uid);
+  }
+
+  /**
+   * All lore entries in declaration order. The array is shared; do not mutate it.
+   */
+  getEntries(pack: WorldPack): LoreEntry[] {
+    return this.getIndex(pack).entries;
   }
 
   getNPC(pack: WorldPack, npcId: string): NPCData | undefined {
@@ -95,6 +345,18 @@ export class WorldPackLoader {
     return pack.regions[regionId];
   }
 
+  getPresetCharacter(pack: WorldPack, presetId: string): PresetCharacter | undefined {
+    return this.getIndex(pack).presetsById.get(presetId);
+  }
+
+  /**
+   * Where new games start: the first location tagged `starting_area`, falling
+   * back to the first location in the pack.
+   */
+  getStartingLocationId(pack: WorldPack): string | undefined {
+    return this.getIndex(pack).startingLocationId;
+  }
+
   getLocationRegion(pack: WorldPack, locationId: string): RegionData | undefined {
     const location = this.getLocation(pack, locationId);
     if (!location || !location.region_id) {
@@ -103,8 +365,11 @@ export class WorldPackLoader {
     return this.getRegion(pack, location.region_id);
   }
 
+  /**
+   * Constant entries in declaration order. The array is shared; do not mutate it.
+   */
   getConstantEntries(pack: WorldPack): LoreEntry[] {
-    return Object.values(pack.entries).filter((e) => e.constant);
+    return this.getIndex(pack).constantEntries;
   }
 
   getLoreForLocation(
@@ -148,6 +413,30 @@ export class WorldPackLoader {
     return matches.sort((a, b) => a.order - b.order);
   }
 
+  /**
+   * Entries of the given visibility that name the location or the region in
+   * their applicable scopes, in declaration order. Unscoped (global) lore is
+   * not included.
+   */
+  getScopedLore(
+    pack: WorldPack,
+    locationId: string,
+    regionId: string | undefined,
+    visibility: string = 'basic'
+  ): LoreEntry[] {
+    const index = this.getIndex(pack);
+    const bucket = index.scopedBuckets.get(visibility);
+    if (!bucket) {
+      return [];
+    }
+
+    return unionByPosition(
+      bucket.byLocation.get(locationId) ?? [],
+      (regionId !== undefined && bucket.byRegion.get(regionId)) || [],
+      index.positions
+    );
+  }
+
   searchEntriesByKeyword(
     pack: WorldPack,
     keyword: string,
@@ -179,18 +468,46 @@ export class WorldPackLoader {
     return matches.sort((a, b) => a.order - b.order);
   }
 
+  /**
+   * Entries with a keyword containing `term` (case-insensitive), split into
+   * primary and secondary-only matches. Scans the pack's distinct keywords
+   * rather than every entry's key lists.
+   */
+  findEntriesByKeywordTerm(pack: WorldPack, term: string): KeywordTermMatches {
+    const index = this.getIndex(pack);
+    const termLower = term.toLowerCase();
+
+    const primaryMatched = new Set<LoreEntry>();
+    collectContainingKeyword(index.primaryKeywords, termLower, primaryMatched);
+    const matched = new Set(primaryMatched);
+    collectContainingKeyword(index.secondaryKeywords, termLower, matched);
+
+    if (matched.size === 0) {
+      return { all: [], primary: [], secondary: [] };
+    }
+
+    const all = [...matched].sort((a, b) => index.positions.get(a)! - index.positions.get(b)!);
+    return {
+      all,
+      primary: all.filter((entry) => primaryMatched.has(entry)),
+      secondary: all.filter((entry) => !primaryMatched.has(entry)),
+    };
+  }
+
   // ============================================================
   // Lore Auto-Indexing (Phase 1.1 & 1.2)
   // ============================================================
 
   /**
    * Compute SHA-256 hash of world pack entries for change detection.
-   * Only hashes the lore entries (content, keys, metadata) since that's what we index.
+   * Only hashes the lore entries (content, keys, metadata) since that's what we index,
+   * plus the embedding model id so switching model or precision re-indexes.
    *
    * @param pack - WorldPack to hash
+   * @param embeddingModelId - Identifier of the model producing the vectors
    * @returns SHA-256 hash string (hex)
    */
-  private computePackHash(pack: WorldPack): string {
+  private computePackHash(pack: WorldPack, embeddingModelId: string): string {
     const entriesData = Object.values(pack.entries)
       .map((entry) => ({
         uid: entry.uid,
@@ -205,7 +522,7 @@ export class WorldPackLoader {
       }))
       .sort((a, b) => a.uid - b.uid);
 
-    const hashInput = JSON.stringify(entriesData);
+    const hashInput = JSON.stringify({ model: embeddingModelId, entries: entriesData });
     return crypto.createHash('sha256').update(hashInput).digest('hex');
   }
 
@@ -231,7 +548,7 @@ export class WorldPackLoader {
     }
 
     const collectionName = `lore_entries_${packId}`;
-    const currentHash = this.computePackHash(pack);
+    const currentHash = this.computePackHash(pack, this.vectorStore.getEmbeddingModelId());
 
     // Check if re-indexing is needed
     const storedHash = await this.vectorStore.getTableMetadata(collectionName, 'pack_hash');
@@ -268,7 +585,7 @@ export class WorldPackLoader {
     const ids: string[] = [];
     const metadatas: Record<string, string | number | boolean>[] = [];
 
-    for (const entry of Object.values(pack.entries)) {
+    for (const entry of this.getEntries(pack)) {
       // Chinese document
       if (entry.content.cn) {
         documents.push(entry.content.cn);
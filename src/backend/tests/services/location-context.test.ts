@@ -0,0 +1,78 @@
+import { describe, it, expect, vi, afterEach } from 'vitest';
+import { LocationContextService } from '../../src/services/location-context';
+import { WorldPackLoader } from '../../src/services/world';
+
+const pack: any = {
+  info: {
+    name: { cn: 'Test', en: 'Test' },
+    description: { cn: 'Desc', en: 'Desc' },
+    version: '1.0',
+  },
+  entries: {
+    '1': {
+      uid: 1, key: ['Tower'], secondary_keys: [], content: { cn: '塔的传说', en: 'Tower lore' },
+      comment: null, constant: false, selective: true, order: 1, visibility: 'basic',
+      applicable_regions: [], applicable_locations: ['tower'],
+    },
+  },
+  npcs: {},
+  locations: {
+    tower: {
+      id: 'tower',
+      name: { cn: '高塔', en: 'Tower' },
+      description: { cn: '一座高塔', en: 'A tall tower' },
+      region_id: 'north',
+      visible_items: ['door'],
+      hidden_items: ['key', 'map'],
+    },
+  },
+  regions: {
+    north: {
+      id: 'north',
+      name: { cn: '北境', en: 'North' },
+      atmosphere_keywords: ['cold'],
+    },
+  },
+};
+
+describe('LocationContextService', () => {
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
+  function createService(): LocationContextService {
+    const loader = new WorldPackLoader('/unused');
+    vi.spyOn(loader, 'load').mockResolvedValue(pack);
+    return new LocationContextService(loader);
+  }
+
+  it('should split hidden items by discovery state', async () => {
+    const context = await createService().getContextForLocation('p', 'tower', ['map'], 'en');
+
+    expect(context.region.name).toBe('North');
+    expect(context.location.visible_items).toEqual(['door']);
+    expect(context.location.hidden_items_revealed).toEqual(['map']);
+    expect(context.location.hidden_items_remaining).toEqual(['key']);
+    expect(context.basic_lore).toEqual(['Tower lore']);
+  });
+
+  it('should not let one caller mutate the context another caller receives', async () => {
+    const service = createService();
+
+    const first = await service.getContextForLocation('p', 'tower', [], 'en');
+    first.location.visible_items.push('stolen');
+    first.location.hidden_items_remaining.length = 0;
+    first.region.atmosphere_keywords.push('warm');
+    first.basic_lore.push('rumor');
+    first.location.name = 'Renamed';
+
+    const second = await service.getContextForLocation('p', 'tower', [], 'en');
+    expect(second).not.toBe(first);
+    expect(second.location.visible_items).toEqual(['door']);
+    expect(second.location.hidden_items_remaining).toEqual(['key', 'map']);
+    expect(second.region.atmosphere_keywords).toEqual(['cold']);
+    expect(second.basic_lore).toEqual(['Tower lore']);
+    expect(second.location.name).toBe('Tower');
+    expect(pack.locations.tower.visible_items).toEqual(['door']);
+  });
+});
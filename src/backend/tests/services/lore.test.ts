@@ -0,0 +1,308 @@
+import { describe, it, expect, vi, beforeEach, afterEach } from 'vitest';
+import { LoreService } from '../../src/services/lore';
+import { WorldPackLoader } from '../../src/services/world';
+
+function makeEntry(uid: number, overrides: Record<string, unknown> = {}): any {
+  return {
+    uid,
+    key: [`keyword${uid}`],
+    secondary_keys: [],
+    content: { cn: `内容${uid}`, en: `Content ${uid}` },
+    comment: null,
+    constant: false,
+    selective: true,
+    order: uid,
+    visibility: 'basic',
+    applicable_regions: [],
+    applicable_locations: [],
+    ...overrides,
+  };
+}
+
+function makePack(entries: any[]): any {
+  return {
+    info: {
+      name: { cn: 'Test', en: 'Test' },
+      description: { cn: 'Desc', en: 'Desc' },
+      version: '1.0',
+    },
+    entries: Object.fromEntries(entries.map((entry) => [String(entry.uid), entry])),
+    npcs: {},
+    locations: {},
+    regions: {},
+  };
+}
+
+/** Loader whose load() resolves to the given pack without touching disk */
+function stubLoader(pack: any): WorldPackLoader {
+  const loader = new WorldPackLoader('/unused');
+  vi.spyOn(loader, 'load').mockResolvedValue(pack);
+  return loader;
+}
+
+function stubVectorStore(): any {
+  return {
+    search: vi.fn().mockResolvedValue([]),
+    searchBatch: vi.fn().mockResolvedValue([]),
+  };
+}
+
+describe('LoreService', () => {
+  beforeEach(() => {
+    vi.useFakeTimers();
+  });
+
+  afterEach(() => {
+    vi.useRealTimers();
+    vi.restoreAllMocks();
+  });
+
+  describe('search cache', () => {
+    it('should serve a repeated query from the cache', async () => {
+      const loader = stubLoader(makePack([makeEntry(1)]));
+      const findSpy = vi.spyOn(loader, 'findEntriesByKeywordTerm');
+      const service = new LoreService(loader);
+
+      const first = await service.search({ query: 'keyword1', lang: 'en' });
+      const second = await service.search({ query: 'keyword1', lang: 'en' });
+
+      expect(second).toBe(first);
+      expect(findSpy).toHaveBeenCalledTimes(1);
+      expect(service.getCacheStats()).toMatchObject({ size: 1, hits: 1, misses: 1, hitRate: 0.5 });
+    });
+
+    it('should expire cached results after the TTL', async () => {
+      const service = new LoreService(stubLoader(makePack([makeEntry(1)])));
+
+      await service.search({ query: 'keyword1' });
+      vi.advanceTimersByTime(59_999);
+      await service.search({ query: 'keyword1' });
+      vi.advanceTimersByTime(1);
+      await service.search({ query: 'keyword1' });
+
+      expect(service.getCacheStats()).toMatchObject({ hits: 1, misses: 2 });
+    });
+
+    it('should evict the least recently used result when full', async () => {
+      const service = new LoreService(stubLoader(makePack([makeEntry(1)])));
+      const { maxSize } = service.getCacheStats();
+
+      for (let i = 0; i < maxSize; i++) {
+        await service.search({ query: `query ${i}` });
+      }
+      // Touch the oldest entry so the second one becomes the eviction candidate
+      await service.search({ query: 'query 0' });
+      await service.search({ query: 'one more query' });
+
+      expect(service.getCacheStats().size).toBe(maxSize);
+
+      await service.search({ query: 'query 0' });
+      expect(service.getCacheStats().hits).toBe(2);
+      await service.search({ query: 'query 1' });
+      expect(service.getCacheStats().hits).toBe(2);
+    });
+
+    it('should not reuse results computed against a previous pack object', async () => {
+      const loader = new WorldPackLoader('/unused');
+      vi.spyOn(loader, 'load')
+        .mockResolvedValueOnce(makePack([makeEntry(1)]))
+        .mockResolvedValueOnce(makePack([makeEntry(1, { content: { cn: '新内容', en: 'New' } })]));
+      const service = new LoreService(loader);
+
+      const before = await service.search({ query: 'keyword1' });
+      const after = await service.search({ query: 'keyword1' });
+
+      expect(after).not.toBe(before);
+      expect(after).toContain('新内容');
+      expect(service.getCacheStats().hits).toBe(0);
+    });
+
+    it('should not cache a result whose vector search failed', async () => {
+      const vectorStore = stubVectorStore();
+      vectorStore.search.mockRejectedValueOnce(new Error('query failed'));
+      vi.spyOn(console, 'error').mockImplementation(() => {});
+      const service = new LoreService(stubLoader(makePack([makeEntry(1)])), vectorStore);
+
+      const failed = service.search({ query: 'keyword1' });
+      await vi.advanceTimersByTimeAsync(5);
+      await failed;
+
+      expect(service.getCacheStats().size).toBe(0);
+
+      const retried = service.search({ query: 'keyword1' });
+      await vi.advanceTimersByTimeAsync(5);
+      await retried;
+
+      expect(vectorStore.search).toHaveBeenCalledTimes(2);
+      expect(service.getCacheStats().size).toBe(1);
+    });
+
+    it('should not cache results while the pack is still being indexed', async () => {
+      const vectorStore = stubVectorStore();
+      const loader = stubLoader(makePack([makeEntry(1)]));
+      const indexing = vi.spyOn(loader, 'isIndexing').mockReturnValue(true);
+      const service = new LoreService(loader, vectorStore);
+
+      const during = service.search({ query: 'keyword1' });
+      await vi.advanceTimersByTimeAsync(5);
+      await during;
+      expect(service.getCacheStats().size).toBe(0);
+
+      indexing.mockReturnValue(false);
+      const after = service.search({ query: 'keyword1' });
+      await vi.advanceTimersByTimeAsync(5);
+      await after;
+      expect(service.getCacheStats().size).toBe(1);
+    });
+  });
+
+  describe('vector search batching', () => {
+    const pack = makePack([makeEntry(1), makeEntry(2)]);
+    const hit = (uid: number) => ({ id: String(uid), text: '', distance: 0.1 });
+
+    it('should send concurrent queries as one batch', async () => {
+      const vectorStore = stubVectorStore();
+      vectorStore.searchBatch.mockResolvedValue([[hit(1)], [hit(2)]]);
+      const service = new LoreService(stubLoader(pack), vectorStore);
+
+      const first = service.search({ query: 'alpha', lang: 'en' });
+      const second = service.search({ query: 'bravo', lang: 'en' });
+      await vi.advanceTimersByTimeAsync(5);
+
+      expect(await first).toContain('Content 1');
+      expect(await first).not.toContain('Content 2');
+      expect(await second).toContain('Content 2');
+      expect(vectorStore.searchBatch).toHaveBeenCalledTimes(1);
+      expect(vectorStore.searchBatch).toHaveBeenCalledWith(
+        'lore_entries_demo_pack',
+        ['alpha', 'bravo'],
+        10,
+        'lang = "en"'
+      );
+      expect(vectorStore.search).not.toHaveBeenCalled();
+    });
+
+    it('should wait for the batch window before querying', async () => {
+      const vectorStore = stubVectorStore();
+      const service = new LoreService(stubLoader(pack), vectorStore);
+
+      const pending = service.search({ query: 'alpha' });
+      await vi.advanceTimersByTimeAsync(4);
+      expect(vectorStore.search).not.toHaveBeenCalled();
+
+      await vi.advanceTimersByTimeAsync(1);
+      await pending;
+      expect(vectorStore.search).toHaveBeenCalledTimes(1);
+    });
+
+    it('should use a single search for a lone query', async () => {
+      const vectorStore = stubVectorStore();
+      vectorStore.search.mockResolvedValue([hit(2)]);
+      const service = new LoreService(stubLoader(pack), vectorStore);
+
+      const pending = service.search({ query: 'alpha', lang: 'en' });
+      await vi.advanceTimersByTimeAsync(5);
+
+      expect(await pending).toContain('Content 2');
+      expect(vectorStore.search).toHaveBeenCalledWith(
+        'lore_entries_demo_pack',
+        'alpha',
+        10,
+        'lang = "en"'
+      );
+      expect(vectorStore.searchBatch).not.toHaveBeenCalled();
+    });
+
+    it('should batch separately per language filter', async () => {
+      const vectorStore = stubVectorStore();
+      const service = new LoreService(stubLoader(pack), vectorStore);
+
+      const english = service.search({ query: 'alpha' });
+      const chinese = service.search({ query: '高塔' });
+      await vi.advanceTimersByTimeAsync(5);
+      await Promise.all([english, chinese]);
+
+      expect(vectorStore.search).toHaveBeenCalledTimes(2);
+      expect(vectorStore.search.mock.calls.map((call: unknown[]) => call[3])).toEqual([
+        'lang = "en"',
+        'lang = "cn"',
+      ]);
+      expect(vectorStore.searchBatch).not.toHaveBeenCalled();
+    });
+
+    it('should fail every query in a batch when the batch fails', async () => {
+      const vectorStore = stubVectorStore();
+      vectorStore.searchBatch.mockRejectedValue(new Error('batch failed'));
+      const errorSpy = vi.spyOn(console, 'error').mockImplementation(() => {});
+      const service = new LoreService(stubLoader(pack), vectorStore);
+
+      const first = service.search({ query: 'keyword1', lang: 'en' });
+      const second = service.search({ query: 'keyword2', lang: 'en' });
+      await vi.advanceTimersByTimeAsync(5);
+
+      // Each search falls back to its keyword matches
+      expect(await first).toContain('Content 1');
+      expect(await second).toContain('Content 2');
+      expect(errorSpy).toHaveBeenCalledTimes(2);
+      expect(service.getCacheStats().size).toBe(0);
+    });
+  });
+
+  describe('ranking', () => {
+    /** Entry uids in the order they appear in a formatted result */
+    const uidsIn = (result: string) =>
+      [...result.matchAll(/Content (\d+)/g)].map((match) => Number(match[1]));
+
+    async function rank(pack: any, query: string, vectorHits: number[] = []): Promise<number[]> {
+      const vectorStore = stubVectorStore();
+      vectorStore.search.mockResolvedValue(
+        vectorHits.map((uid) => ({ id: String(uid), text: '', distance: 0.1 }))
+      );
+      const service = new LoreService(stubLoader(pack), vectorStore);
+
+      const pending = service.search({ query, lang: 'en' });
+      await vi.advanceTimersByTimeAsync(5);
+      return uidsIn(await pending);
+    }
+
+    it('should raise a weakly matched constant to the constant floor', async () => {
+      const pack = makePack([
+        makeEntry(1, { key: ['tower'], order: 1 }),
+        makeEntry(2, { key: ['castle'], secondary_keys: ['tower'], constant: true, order: 50 }),
+      ]);
+
+      // The constant's secondary match alone would score below the primary match
+      expect(await rank(pack, 'tower')).toEqual([2, 1]);
+    });
+
+    it('should raise a vector-only constant to the constant floor', async () => {
+      const pack = makePack([
+        makeEntry(1, { key: ['tower'], order: 1 }),
+        makeEntry(2, { key: ['castle'], constant: true, order: 50 }),
+        makeEntry(3, { key: ['forest'], order: 2 }),
+      ]);
+
+      expect(await rank(pack, 'tower', [2, 3])).toEqual([2, 1, 3]);
+    });
+
+    it('should prefer constants on equal scores, then lower order', async () => {
+      const pack = makePack([
+        makeEntry(1, { key: ['tower'], order: 1 }),
+        makeEntry(2, { key: ['castle'], constant: true, order: 30 }),
+        makeEntry(3, { key: ['tower gate'], order: 0 }),
+        makeEntry(4, { key: ['dungeon'], constant: true, order: 20 }),
+      ]);
+
+      expect(await rank(pack, 'tower')).toEqual([4, 2, 3, 1]);
+    });
+
+    it('should keep the top results of a stable sort by score', async () => {
+      const orders = [30, 10, 20, 10, 40, 5, 25, 15];
+      const pack = makePack(orders.map((order, i) => makeEntry(i + 1, { key: ['shared'], order })));
+
+      // 3 and 7 are boosted by a vector match; 2 and 4 tie on score and order
+      // and keep declaration order
+      expect(await rank(pack, 'shared', [3, 7])).toEqual([3, 7, 6, 2, 4]);
+    });
+  });
+});
@@ -23,6 +23,10 @@ describe('WorldPackLoader', () => {
     loader = new WorldPackLoader(mockPacksDir);
   });
 
+  afterEach(() => {
+    vi.restoreAllMocks();
+  });
+
   describe('listAvailable', () => {
     it('should return list of available pack IDs', async () => {
       (fs.readdir as any).mockResolvedValue([
@@ -95,6 +99,132 @@ describe('WorldPackLoader', () => {
 
       expect(fs.readFile).toHaveBeenCalledTimes(1);
     });
+
+    it('should share one read between concurrent loads of the same pack', async () => {
+      const validPack = {
+        info: {
+          name: { cn: 'Test', en: 'Test' },
+          description: { cn: 'Desc', en: 'Desc' },
+          version: '1.0'
+        },
+        locations: {}, npcs: {}, entries: {}, regions: {}
+      };
+      (fs.readFile as any).mockResolvedValue(JSON.stringify(validPack));
+
+      const [first, second] = await Promise.all([
+        loader.load('concurrent_pack'),
+        loader.load('concurrent_pack'),
+      ]);
+
+      expect(first).toBe(second);
+      expect(fs.readFile).toHaveBeenCalledTimes(1);
+    });
+
+    it('should re-read a pack after it is invalidated', async () => {
+      const validPack = {
+        info: {
+          name: { cn: 'Test', en: 'Test' },
+          description: { cn: 'Desc', en: 'Desc' },
+          version: '1.0'
+        },
+        locations: {}, npcs: {}, entries: {}, regions: {}
+      };
+      (fs.readFile as any).mockResolvedValue(JSON.stringify(validPack));
+
+      const first = await loader.load('reloaded_pack');
+      loader.invalidate('reloaded_pack');
+      const second = await loader.load('reloaded_pack');
+
+      expect(second).not.toBe(first);
+      expect(fs.readFile).toHaveBeenCalledTimes(2);
+    });
+
+    it('should not keep a pack whose load was invalidated mid-flight', async () => {
+      const validPack = {
+        info: {
+          name: { cn: 'Test', en: 'Test' },
+          description: { cn: 'Desc', en: 'Desc' },
+          version: '1.0'
+        },
+        locations: {}, npcs: {}, entries: {}, regions: {}
+      };
+      let resolveStale!: (content: string) => void;
+      (fs.readFile as any)
+        .mockImplementationOnce(() => new Promise((resolve) => { resolveStale = resolve; }))
+        .mockResolvedValue(JSON.stringify(validPack));
+
+      const staleLoad = loader.load('racy_pack');
+      loader.invalidate('racy_pack');
+      const freshLoad = loader.load('racy_pack');
+
+      resolveStale(JSON.stringify(validPack));
+      const [stale, fresh] = await Promise.all([staleLoad, freshLoad]);
+
+      expect(stale).not.toBe(fresh);
+      expect(await loader.load('racy_pack')).toBe(fresh);
+      expect(fs.readFile).toHaveBeenCalledTimes(2);
+    });
+
+    it('should report a pack as indexing until its vector index is written', async () => {
+      const validPack = {
+        info: {
+          name: { cn: 'Test', en: 'Test' },
+          description: { cn: 'Desc', en: 'Desc' },
+          version: '1.0'
+        },
+        locations: {}, npcs: {}, entries: {}, regions: {}
+      };
+      (fs.readFile as any).mockResolvedValue(JSON.stringify(validPack));
+      let finishIndexing!: () => void;
+      const indexingLoader = new WorldPackLoader(mockPacksDir, {} as any);
+      vi.spyOn(indexingLoader, 'indexLoreEntriesAsync').mockReturnValue(
+        new Promise<void>((resolve) => { finishIndexing = resolve; })
+      );
+
+      await indexingLoader.load('indexed_pack');
+      expect(indexingLoader.isIndexing('indexed_pack')).toBe(true);
+
+      finishIndexing();
+      await vi.waitFor(() => expect(indexingLoader.isIndexing('indexed_pack')).toBe(false));
+    });
+  });
+
+  describe('indexLoreEntriesAsync', () => {
+    const indexedPack: any = {
+      entries: {
+        '1': {
+          uid: 1, key: ['Tower'], content: { cn: '塔', en: 'Tower' }, order: 1, constant: false,
+          visibility: 'basic', applicable_regions: [], applicable_locations: [],
+        },
+      },
+    };
+
+    function stubVectorStore(modelId: string, storedHash: string | null): any {
+      return {
+        getEmbeddingModelId: vi.fn().mockReturnValue(modelId),
+        getTableMetadata: vi.fn().mockResolvedValue(storedHash),
+        setTableMetadata: vi.fn().mockResolvedValue(undefined),
+        tableExists: vi.fn().mockResolvedValue(storedHash !== null),
+        deleteTable: vi.fn().mockResolvedValue(undefined),
+        addDocuments: vi.fn().mockResolvedValue(undefined),
+      };
+    }
+
+    it('should re-index when the embedding model id changes', async () => {
+      vi.spyOn(console, 'log').mockImplementation(() => {});
+      const first = stubVectorStore('model:fp32', null);
+      await new WorldPackLoader(mockPacksDir, first).indexLoreEntriesAsync('p', indexedPack);
+      const storedHash = first.setTableMetadata.mock.calls[0][2];
+
+      const sameModel = stubVectorStore('model:fp32', storedHash);
+      await new WorldPackLoader(mockPacksDir, sameModel).indexLoreEntriesAsync('p', indexedPack);
+      expect(sameModel.addDocuments).not.toHaveBeenCalled();
+
+      const otherDtype = stubVectorStore('model:q8', storedHash);
+      await new WorldPackLoader(mockPacksDir, otherDtype).indexLoreEntriesAsync('p', indexedPack);
+      expect(otherDtype.deleteTable).toHaveBeenCalledWith('lore_entries_p');
+      expect(otherDtype.addDocuments).toHaveBeenCalledTimes(1);
+    });
   });
 
   describe('Helper methods', () => {
@@ -129,5 +259,97 @@ describe('WorldPackLoader', () => {
       const region = loader.getLocationRegion(mockPack, 'loc_1');
       expect(region?.id).toBe('reg_1');
     });
+
+    it('getStartingLocationId should prefer the starting_area tag', () => {
+      const taggedPack: any = {
+        entries: {},
+        locations: {
+          loc_a: { id: 'loc_a', tags: [] },
+          loc_b: { id: 'loc_b', tags: ['starting_area'] },
+        },
+      };
+
+      expect(loader.getStartingLocationId(taggedPack)).toBe('loc_b');
+      expect(loader.getStartingLocationId(mockPack)).toBe('loc_1');
+      expect(loader.getStartingLocationId({ entries: {}, locations: {} } as any)).toBeUndefined();
+    });
+
+    it('searchEntriesByKeyword should match keywords in both directions', () => {
+      const keywordPack: any = {
+        entries: {
+          '1': { uid: 1, key: ['Old Tower'], secondary_keys: [], order: 20 },
+          '2': { uid: 2, key: ['Tower'], secondary_keys: ['ruins'], order: 10 },
+          '3': { uid: 3, key: ['Forest'], secondary_keys: ['Tower ruins'], order: 5 },
+        },
+      };
+
+      const results = loader.searchEntriesByKeyword(keywordPack, 'tower');
+      expect(results.map((e) => e.uid)).toEqual([3, 2, 1]);
+
+      const primaryOnly = loader.searchEntriesByKeyword(keywordPack, 'tower', false);
+      expect(primaryOnly.map((e) => e.uid)).toEqual([2, 1]);
+
+      const superstring = loader.searchEntriesByKeyword(keywordPack, 'the old tower gate', false);
+      expect(superstring.map((e) => e.uid)).toEqual([2, 1]);
+
+      expect(loader.searchEntriesByKeyword(keywordPack, 'castle')).toEqual([]);
+    });
+
+    it('findEntriesByKeywordTerm should split primary and secondary-only matches', () => {
+      const keywordPack: any = {
+        entries: {
+          '1': { uid: 1, key: ['Old Tower'], secondary_keys: [], order: 20 },
+          '2': { uid: 2, key: ['Forest'], secondary_keys: ['Tower ruins'], order: 10 },
+          '3': { uid: 3, key: ['Tower'], secondary_keys: ['tower'], order: 5 },
+        },
+      };
+
+      const matches = loader.findEntriesByKeywordTerm(keywordPack, 'TOWER');
+      expect(matches.all.map((e) => e.uid)).toEqual([1, 2, 3]);
+      expect(matches.primary.map((e) => e.uid)).toEqual([1, 3]);
+      expect(matches.secondary.map((e) => e.uid)).toEqual([2]);
+
+      expect(loader.findEntriesByKeywordTerm(keywordPack, 'the old tower').all).toEqual([]);
+    });
+
+    it('getLoreForLocation should combine constant, global, location and region lore', () => {
+      const lorePack: any = {
+        entries: {
+          '1': { uid: 1, constant: true, visibility: 'hidden', order: 30, applicable_locations: [], applicable_regions: [] },
+          '2': { uid: 2, constant: false, visibility: 'basic', order: 20, applicable_locations: [], applicable_regions: [] },
+          '3': { uid: 3, constant: false, visibility: 'basic', order: 10, applicable_locations: ['loc_1'], applicable_regions: [] },
+          '4': { uid: 4, constant: false, visibility: 'basic', order: 5, applicable_locations: ['loc_2'], applicable_regions: ['reg_1'] },
+          '5': { uid: 5, constant: false, visibility: 'basic', order: 40, applicable_locations: [], applicable_regions: ['reg_1'] },
+          '6': { uid: 6, constant: false, visibility: 'hidden', order: 1, applicable_locations: [], applicable_regions: [] },
+        },
+        locations: {
+          loc_1: { id: 'loc_1', region_id: 'reg_1' },
+          loc_2: { id: 'loc_2' },
+        },
+        regions: {
+          reg_1: { id: 'reg_1' },
+        },
+      };
+
+      expect(loader.getLoreForLocation(lorePack, 'loc_1').map((e) => e.uid)).toEqual([3, 2, 1, 5]);
+      expect(loader.getLoreForLocation(lorePack, 'loc_2').map((e) => e.uid)).toEqual([4, 2, 1]);
+      expect(loader.getLoreForLocation(lorePack, 'loc_1', 'hidden').map((e) => e.uid)).toEqual([6, 1]);
+    });
+
+    it('getScopedLore should return location and region scoped lore in declaration order', () => {
+      const lorePack: any = {
+        entries: {
+          '1': { uid: 1, visibility: 'basic', applicable_locations: [], applicable_regions: ['reg_1'] },
+          '2': { uid: 2, visibility: 'basic', applicable_locations: [], applicable_regions: [] },
+          '3': { uid: 3, visibility: 'basic', applicable_locations: ['loc_1'], applicable_regions: ['reg_1'] },
+          '4': { uid: 4, visibility: 'hidden', applicable_locations: ['loc_1'], applicable_regions: [] },
+          '5': { uid: 5, visibility: 'basic', applicable_locations: ['loc_1'], applicable_regions: [] },
+        },
+      };
+
+      expect(loader.getScopedLore(lorePack, 'loc_1', 'reg_1').map((e) => e.uid)).toEqual([1, 3, 5]);
+      expect(loader.getScopedLore(lorePack, 'loc_1', undefined).map((e) => e.uid)).toEqual([3, 5]);
+      expect(loader.getScopedLore(lorePack, 'loc_2', 'reg_1').map((e) => e.uid)).toEqual([1, 3]);
+    });
   });
 });